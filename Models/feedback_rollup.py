@@ -0,0 +1,36 @@
+# BackEnd/Models/feedback_rollup.py
+
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from BackEnd.Utils.database import Base
+
+
+class FeedbackDailyRollup(Base):
+    """
+    Per-child, per-day feedback aggregates, maintained incrementally on feedback
+    submission and rebuilt by the compaction job. Analytics read these instead of chat_logs.
+    """
+    __tablename__ = "feedback_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    child_id = Column(Integer, ForeignKey("child_profiles.child_id", ondelete="CASCADE"), primary_key=True)
+
+    # All rated chat logs
+    feedback_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    improvement_count = Column(Integer, nullable=False, default=0)  # Rating above the child's previous rating
+
+    # Rated chat logs that also have a sentiment score (sums for Pearson correlation)
+    paired_count = Column(Integer, nullable=False, default=0)
+    paired_rating_sum = Column(Float, nullable=False, default=0.0)
+    paired_rating_sq_sum = Column(Float, nullable=False, default=0.0)
+    paired_sentiment_sum = Column(Float, nullable=False, default=0.0)
+    paired_sentiment_sq_sum = Column(Float, nullable=False, default=0.0)
+    paired_product_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_feedback_rollup_child_day", "child_id", "day"),
+    )
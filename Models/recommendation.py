@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
@@ -19,6 +19,11 @@ class RecommendationPriority(str, PyEnum):
     LOW = "low"
 
 
+# Only generated recommendations are deduplicated; rows entered by parents or
+# professionals may legitimately repeat a title on the same day
+GENERATED_ONLY = text("source = 'AI_MODEL'")
+
+
 class Recommendation(Base):
     __tablename__ = "recommendations"
 
@@ -33,4 +38,14 @@ class Recommendation(Base):
     type = Column(String(50))  # 'behavior' or 'emotional'
     extra_data = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
-    child_profile = relationship("ChildProfile", back_populates="recommendations")  # ✅ Bidirectional link
\ No newline at end of file
+    child_profile = relationship("ChildProfile", back_populates="recommendations")  # ✅ Bidirectional link
+
+    __table_args__ = (
+        # One generated row per recommendation per day; the bulk writer inserts with ON CONFLICT DO NOTHING
+        Index(
+            "uq_recommendation_child_title_type_date", "child_id", "title", "type", "effective_date",
+            unique=True, postgresql_where=GENERATED_ONLY, sqlite_where=GENERATED_ONLY,
+        ),
+        # Keyset pagination of a child's listing, newest first
+        Index("ix_recommendation_child_created", "child_id", "created_at", "id"),
+    )
@@ -5,38 +5,35 @@ from sqlalchemy import func
 from BackEnd.Models.chat_log import ChatLog
 from BackEnd.Utils.auth_utils import get_current_user, require_role
 from BackEnd.Utils.database import get_db
-import asyncio
 # Import models and utils
 from BackEnd.Models.user import User
 from BackEnd.Schemas.feedback import FeedbackCreate
+from BackEnd.Utils.analytics import (
+    analyze_recommendation_effectiveness, calculate_feedback_trend, get_feedback_summary, get_sentiment_correlation
+)
+from BackEnd.Utils.feedback_broadcaster import feedback_broadcaster
+from BackEnd.Utils.feedback_export import gzip_chunks, iter_csv, iter_feedback_rows, iter_parquet, parquet_available
+from BackEnd.Utils.feedback_rollups import apply_feedback
 
 router = APIRouter(tags=["Analytics"])
 from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
-import csv
 from fastapi.websockets import WebSocketDisconnect
-from io import StringIO
-from typing import Optional
-
-# Real-time feedback stream
-connected_clients = set()
-
-
-async def notify_clients(feedback_data):
-    for client in connected_clients:
-        await client.send_json(feedback_data)
+from typing import Literal, Optional
 
 
+# Real-time feedback stream
 @router.websocket("/feedback-stream")
 async def feedback_stream(websocket: WebSocket):
-    await websocket.accept()
-    connected_clients.add(websocket)
+    await feedback_broadcaster.connect(websocket)
     try:
         while True:
-            await asyncio.sleep(1)
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+        pass
+    finally:
+        await feedback_broadcaster.disconnect(websocket)
 
 
 # Feedback submission
@@ -50,68 +47,66 @@ def submit_feedback(
     if not chat_log:
         raise HTTPException(status_code=404, detail="Chat log not found")
 
+    previous_rating = chat_log.rating
     chat_log.feedback = feedback_data.comment
     chat_log.rating = feedback_data.rating
+    apply_feedback(db, chat_log, previous_rating)
     db.commit()
 
-    # Notify real-time clients
-    asyncio.create_task(notify_clients({
+    # Notify real-time clients on every worker
+    feedback_broadcaster.publish_threadsafe({
         "chat_log_id": feedback_data.chat_log_id,
         "rating": feedback_data.rating,
         "timestamp": datetime.utcnow().isoformat()
-    }))
+    })
 
     return {"status": "success", "message": "Feedback submitted"}
 
 
 # Analytics endpoint
 @router.get("/feedback-analytics")
-def get_feedback_analytics(db: Session = Depends(get_db)):
-    total_feedback = db.query(ChatLog).filter(ChatLog.rating.isnot(None)).count()
-    avg_rating = db.query(func.avg(ChatLog.rating)).scalar() or 0
+def get_feedback_analytics(db: Session = Depends(get_db), days: int = Query(30, ge=1, le=365)):
+    summary = get_feedback_summary(db)
 
     return {
-        "total_feedback": total_feedback,
-        "average_rating": round(avg_rating, 2),
-        "improvement_rate": "45%"
+        "total_feedback": summary["total_feedback"],
+        "average_rating": summary["average_rating"],
+        "improvement_rate": analyze_recommendation_effectiveness(db)["improvement_rate"],
+        "feedback_trend": calculate_feedback_trend(db, days),
+        "sentiment_correlation": get_sentiment_correlation(db)["correlation"]
     }
 
 
 # Export endpoint
 @router.get("/export-feedback", dependencies=[Depends(require_role("admin"))])
 def export_feedback(
-        db: Session = Depends(get_db),
         start_date: Optional[datetime] = Query(None),
         end_date: Optional[datetime] = Query(None),
-        child_id: Optional[str] = Query(None)
+        child_id: Optional[int] = Query(None),
+        format: Literal["csv", "parquet"] = Query("csv"),
+        gzip: bool = Query(False)
 ):
-    query = db.query(ChatLog).filter(ChatLog.rating.isnot(None))
-
-    if start_date:
-        query = query.filter(ChatLog.timestamp >= start_date)
-    if end_date:
-        query = query.filter(ChatLog.timestamp <= end_date)
-    if child_id:
-        query = query.filter(ChatLog.child_id == child_id)
-
-    feedback_logs = query.all()
-
-    # Generate CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["User ID", "Child ID", "Rating", "Feedback", "Timestamp"])
-
-    for log in feedback_logs:
-        writer.writerow([
-            log.user_id,
-            log.child_id,
-            log.rating,
-            log.feedback or "",
-            log.timestamp.isoformat() if log.timestamp else ""
-        ])
-
-    return StreamingResponse(  # Fixed response type [[1]](https://www.example.com )
-        iter([output.getvalue()]),
+    rows = iter_feedback_rows(start_date, end_date, child_id)
+
+    if format == "parquet":
+        if not parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+        # Parquet pages are already compressed; gzip is ignored
+        return StreamingResponse(
+            iter_parquet(rows),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": "attachment; filename=feedback.parquet"}
+        )
+
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(iter_csv(rows)),
+            media_type="application/gzip",
+            headers={"Content-Disposition": "attachment; filename=feedback.csv.gz"}
+        )
+
+    return StreamingResponse(
+        iter_csv(rows),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=feedback.csv"}
     )
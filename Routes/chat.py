@@ -1,21 +1,26 @@
 # BackEnd/Routes/chat.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import json
 import logging
 
 from BackEnd.Models.chat_log import ChatLog
-from BackEnd.Models.child_profile import ChildProfile
 from BackEnd.Models.user import User
-from BackEnd.Models.recommendation import Recommendation
 from BackEnd.Schemas.chat import ChatRequest, ChatResponse
-from BackEnd.Utils.database import get_db
+from BackEnd.Utils.database import get_async_db, AsyncSessionFactory
 from BackEnd.Utils.auth_utils import get_current_user
-from BackEnd.Utils.ai_integration import get_ai_response
-from BackEnd.Utils.mongo_client import chat_sessions_collection
-from BackEnd.Utils.encryption import encrypt_data, decrypt_data
+from BackEnd.Utils.ai_integration import get_ai_response, stream_ai_response, build_ai_payload_async
+from BackEnd.Utils.chat_writer import ChatTurn, chat_write_queue
+from BackEnd.Utils.child_access import child_access_cache
+from BackEnd.Utils.conversation_context import History, conversation_context
+from BackEnd.Utils.encryption import decrypt_data, decrypt_many
+from BackEnd.Utils.pagination import encode_cursor, decode_cursor
+from BackEnd.Utils.rate_limiter import rate_limit_dep
 from BackEnd.Utils.recommendation_generator import generate_recommendations_from_emotion
 
 router = APIRouter(tags=["Chat"])
@@ -27,19 +32,51 @@ def chat_health():
     return {"status": "Chat API is running"}
 
 
-@router.post("/", response_model=ChatResponse)
+def _build_turn(user_id: int, chat_request: ChatRequest, ai_payload: Dict[str, Any]) -> ChatTurn:
+    """Collect everything the write-behind queue needs to persist one exchange."""
+    recommendations = list(ai_payload.get("ai_recommendations", []))
+    try:
+        score = ai_payload.get("sentiment_score")
+        if score is not None and score < -0.4:
+            emotion_data = ai_payload.get("emotional_analysis", {})
+            recommendations.extend(generate_recommendations_from_emotion(emotion_data))
+    except Exception as rec_err:
+        logger.warning("Failed to generate emotion-based recommendations: %s", rec_err)
+
+    return ChatTurn(
+        user_id=user_id,
+        child_id=chat_request.child_id,
+        user_input=chat_request.message,
+        ai_response=ai_payload["response"],
+        context=chat_request.context,
+        sentiment=ai_payload.get("sentiment", "neutral"),
+        sentiment_score=ai_payload.get("sentiment_score", 0.0),
+        timestamp=datetime.now(timezone.utc),
+        recommendations=recommendations,
+    )
+
+
+async def _history_for(user_id: int, chat_request: ChatRequest) -> History:
+    if not chat_request.include_history:
+        return ()
+    return await conversation_context.build(user_id, chat_request.child_id)
+
+
+async def _record_turn(turn: ChatTurn):
+    await chat_write_queue.enqueue(turn)
+    await conversation_context.append(
+        turn.user_id, turn.child_id, turn.user_input, turn.ai_response, turn.timestamp
+    )
+
+
+@router.post("/", response_model=ChatResponse, dependencies=[Depends(rate_limit_dep("chat", "ai_upstream"))])
 async def chat_with_ai(
     chat_request: ChatRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    child = db.query(ChildProfile).filter(
-        ChildProfile.child_id == chat_request.child_id,
-        ChildProfile.user_id == current_user.user_id
-    ).first()
-
-    if not child:
-        raise HTTPException(status_code=403, detail="Child profile not found or access denied")
+    child = await child_access_cache.require(db, current_user.user_id, chat_request.child_id)
+    history = await _history_for(current_user.user_id, chat_request)
 
     try:
         ai_payload = await get_ai_response(
@@ -47,86 +84,143 @@ async def chat_with_ai(
             child_age=child.age,
             child_name=child.name,
             context=chat_request.context,
+            use_cache=chat_request.use_cache,
+            history=history,
         )
     except Exception as e:
         logger.error("AI integration failed", exc_info=True)
         raise HTTPException(status_code=502, detail="AI service unavailable")
 
-    try:
-        for rec in ai_payload.get("ai_recommendations", []):
-            db.add(Recommendation(child_id=chat_request.child_id, **rec))
-        db.commit()
-    except Exception as rec_err:
-        logger.warning("Failed to save AI recommendations: %s", rec_err)
+    turn = _build_turn(current_user.user_id, chat_request, ai_payload)
+    await _record_turn(turn)
+
+    return ChatResponse(
+        response=ai_payload["response"],
+        suggested_actions=ai_payload.get("suggested_actions", []),
+        sentiment=ai_payload.get("sentiment", "neutral"),
+        timestamp=turn.timestamp
+    )
 
-    enc_input = encrypt_data(chat_request.message)
-    enc_response = encrypt_data(ai_payload["response"])
 
-    chat_log = ChatLog(
-        user_id=current_user.user_id,
-        child_id=chat_request.child_id,
-        user_input=enc_input,
-        chatbot_response=enc_response,
-        context=chat_request.context,
-        sentiment_score=ai_payload.get("sentiment_score", 0.0)
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream", dependencies=[Depends(rate_limit_dep("chat", "ai_upstream"))])
+async def stream_chat_with_ai(
+    chat_request: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-sent events variant of chat_with_ai.
+    Emits `token` events as the model produces output and a final `done` event
+    carrying the ChatResponse once the turn has been queued for persistence.
+    """
+    child = await child_access_cache.require(db, current_user.user_id, chat_request.child_id)
+    child_age, child_name = child.age, child.name
+    user_id = current_user.user_id
+    history = await _history_for(user_id, chat_request)
+
+    async def event_stream():
+        chunks: List[str] = []
+        try:
+            async for token in stream_ai_response(
+                user_input=chat_request.message,
+                child_age=child_age,
+                child_name=child_name,
+                context=chat_request.context,
+                use_cache=chat_request.use_cache,
+                history=history,
+            ):
+                chunks.append(token)
+                yield _sse("token", {"token": token})
+        except Exception:
+            logger.error("AI stream failed", exc_info=True)
+            yield _sse("error", {"error": "AI service unavailable"})
+            return
+
+        ai_payload = await build_ai_payload_async("".join(chunks).strip())
+        turn = _build_turn(user_id, chat_request, ai_payload)
+        await _record_turn(turn)
+
+        response = ChatResponse(
+            response=ai_payload["response"],
+            suggested_actions=ai_payload.get("suggested_actions", []),
+            sentiment=ai_payload.get("sentiment", "neutral"),
+            timestamp=turn.timestamp,
+        )
+        yield _sse("done", response.model_dump(mode="json"))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    db.add(chat_log)
-    db.commit()
-    db.refresh(chat_log)
 
-    try:
-        chat_sessions_collection.insert_one({
-            "user_id": current_user.user_id,
-            "child_id": chat_request.child_id,
-            "user_input": chat_request.message,
-            "ai_response": ai_payload["response"],
-            "context": chat_request.context,
-            "sentiment": ai_payload.get("sentiment", "neutral"),
-            "sentiment_score": ai_payload.get("sentiment_score", 0.0),
-            "timestamp": datetime.utcnow()
-        })
-    except Exception as mongo_err:
-        logger.warning("MongoDB log failed: %s", mongo_err)
 
-    try:
-        score = ai_payload.get("sentiment_score")
-        if score is not None and score < -0.4:
-            emotion_data = ai_payload.get("emotional_analysis", {})
-            auto_recs = generate_recommendations_from_emotion(emotion_data)
+def _history_query(user_id: int, child_id: int, before: Optional[str], after: Optional[str]):
+    stmt = select(ChatLog.id, ChatLog.timestamp, ChatLog._chatbot_response).where(
+        ChatLog.user_id == user_id,
+        ChatLog.child_id == child_id,
+    )
+    if before:
+        stmt = stmt.where(tuple_(ChatLog.timestamp, ChatLog.id) < decode_cursor(before))
+    if after:
+        stmt = stmt.where(tuple_(ChatLog.timestamp, ChatLog.id) > decode_cursor(after))
+    return stmt
 
-            for rec in auto_recs:
-                db.add(Recommendation(child_id=chat_request.child_id, **rec))
-            db.commit()
-    except Exception as rec_err:
-        logger.warning("Failed to generate emotion-based recommendations: %s", rec_err)
 
+def _history_item(timestamp: datetime, response: str) -> ChatResponse:
     return ChatResponse(
-        response=ai_payload["response"],
-        suggested_actions=ai_payload.get("suggested_actions", []),
-        sentiment=ai_payload.get("sentiment", "neutral"),
-        timestamp=chat_log.timestamp
+        response=response,
+        suggested_actions=[],
+        sentiment="unknown",
+        timestamp=timestamp,
     )
 
 
 @router.get("/history/{child_id}", response_model=List[ChatResponse])
-def get_chat_history(
+async def get_chat_history(
     child_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor: return turns older than this position"),
+    after: Optional[str] = Query(None, description="Cursor: return turns newer than this position"),
+    stream: bool = Query(False, description="Stream every matching turn as NDJSON instead of one page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    logs = (
-        db.query(ChatLog)
-        .filter(ChatLog.user_id == current_user.user_id, ChatLog.child_id == child_id)
-        .order_by(ChatLog.timestamp.asc())
-        .all()
-    )
-
-    return [
-        ChatResponse(
-            response=decrypt_data(log.chatbot_response),
-            suggested_actions=[],
-            sentiment="unknown",
-            timestamp=log.timestamp,
-        )
-        for log in logs
-    ]
+    """
+    Keyset-paginated chat history, oldest first within a page.
+    Without cursors the most recent `limit` turns are returned. The X-Before-Cursor and
+    X-After-Cursor headers hold the cursors for the previous (older) and next (newer) page.
+    """
+    stmt = _history_query(current_user.user_id, child_id, before, after)
+
+    if stream:
+        stmt = stmt.order_by(ChatLog.timestamp.asc(), ChatLog.id.asc()).execution_options(yield_per=200)
+
+        async def ndjson_rows():
+            async with AsyncSessionFactory() as stream_db:
+                result = await stream_db.stream(stmt)
+                async for row in result:
+                    # chatbot_response is stored with two encryption layers (route + model setter)
+                    text = decrypt_data(decrypt_data(row._chatbot_response))
+                    yield _history_item(row.timestamp, text).model_dump_json() + "\n"
+
+        return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
+
+    if after:
+        stmt = stmt.order_by(ChatLog.timestamp.asc(), ChatLog.id.asc()).limit(limit)
+        rows = (await db.execute(stmt)).all()
+    else:
+        stmt = stmt.order_by(ChatLog.timestamp.desc(), ChatLog.id.desc()).limit(limit)
+        rows = list(reversed((await db.execute(stmt)).all()))
+
+    if rows:
+        response.headers["X-Before-Cursor"] = encode_cursor(rows[0].timestamp, rows[0].id)
+        response.headers["X-After-Cursor"] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    responses = decrypt_many(decrypt_many(row._chatbot_response for row in rows))
+    return [_history_item(row.timestamp, text) for row, text in zip(rows, responses)]
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
 from BackEnd.Models.user import User
 from BackEnd.Models.child_profile import ChildProfile
-from BackEnd.Models.recommendation import Recommendation
 from BackEnd.Schemas.child_profile import ChildProfileCreate, ChildProfileResponse
-from BackEnd.Utils.database import get_db
+from BackEnd.Utils.database import get_async_db
 from BackEnd.Utils.auth_utils import get_current_user
+from BackEnd.Utils.child_access import child_access_cache
+from BackEnd.Utils.recommendation_writer import write_recommendations_async
 from BackEnd.Utils.recommendation_generator import (
     generate_recommendations_from_behavior,
     generate_recommendations_from_emotion
@@ -19,9 +21,9 @@ router = APIRouter(tags=["Child Profiles"])
 
 
 @router.post("/", response_model=ChildProfileResponse)
-def create_child_profile(
+async def create_child_profile(
     profile_data: ChildProfileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new child profile"""
@@ -36,18 +38,22 @@ def create_child_profile(
     new_profile.set_emotional_data(profile_data.emotional_state)
 
     db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
+    await db.flush()
 
+    # Profile and its starter recommendations commit together; a failed insert only
+    # rolls back its savepoint
     try:
         behavior_recs = generate_recommendations_from_behavior(profile_data.behavioral_patterns)
         emotion_recs = generate_recommendations_from_emotion(profile_data.emotional_state)
-        for rec in behavior_recs + emotion_recs:
-            db.add(Recommendation(child_id=new_profile.child_id, **rec))
-        db.commit()
+        async with db.begin_nested():
+            await write_recommendations_async(db, new_profile.child_id, behavior_recs + emotion_recs)
     except Exception as e:
         logger.warning(f"Failed to generate recommendations: {e}")
 
+    await db.commit()
+    await db.refresh(new_profile)
+    await child_access_cache.invalidate(current_user.user_id)
+
     return ChildProfileResponse(
         child_id=new_profile.child_id,
         user_id=new_profile.user_id,
@@ -61,12 +67,13 @@ def create_child_profile(
 
 
 @router.get("/", response_model=List[ChildProfileResponse])
-def get_all_profiles(
-    db: Session = Depends(get_db),
+async def get_all_profiles(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all child profiles for the current user"""
-    profiles = db.query(ChildProfile).filter(ChildProfile.user_id == current_user.user_id).all()
+    result = await db.execute(select(ChildProfile).where(ChildProfile.user_id == current_user.user_id))
+    profiles = result.scalars().all()
 
     return [
         ChildProfileResponse(
@@ -84,16 +91,17 @@ def get_all_profiles(
 
 
 @router.get("/{child_id}", response_model=ChildProfileResponse)
-def get_single_profile(
+async def get_single_profile(
     child_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Retrieve a specific child profile"""
-    profile = db.query(ChildProfile).filter(
+    result = await db.execute(select(ChildProfile).where(
         ChildProfile.child_id == child_id,
         ChildProfile.user_id == current_user.user_id
-    ).first()
+    ))
+    profile = result.scalar_one_or_none()
 
     if not profile:
         raise HTTPException(status_code=404, detail="Child profile not found")
@@ -111,17 +119,18 @@ def get_single_profile(
 
 
 @router.put("/{child_id}", response_model=ChildProfileResponse)
-def update_child_profile(
+async def update_child_profile(
     child_id: int,
     update_data: ChildProfileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Update a child profile"""
-    profile = db.query(ChildProfile).filter(
+    result = await db.execute(select(ChildProfile).where(
         ChildProfile.child_id == child_id,
         ChildProfile.user_id == current_user.user_id
-    ).first()
+    ))
+    profile = result.scalar_one_or_none()
 
     if not profile:
         raise HTTPException(status_code=404, detail="Child profile not found")
@@ -132,8 +141,9 @@ def update_child_profile(
     profile.set_behavioral_data(update_data.behavioral_patterns)
     profile.set_emotional_data(update_data.emotional_state)
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
+    await child_access_cache.invalidate(current_user.user_id)
 
     return ChildProfileResponse(
         child_id=profile.child_id,
@@ -148,19 +158,21 @@ def update_child_profile(
 
 
 @router.delete("/{child_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_child_profile(
+async def delete_child_profile(
     child_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Delete a child profile"""
-    profile = db.query(ChildProfile).filter(
+    result = await db.execute(select(ChildProfile).where(
         ChildProfile.child_id == child_id,
         ChildProfile.user_id == current_user.user_id
-    ).first()
+    ))
+    profile = result.scalar_one_or_none()
 
     if not profile:
         raise HTTPException(status_code=404, detail="Child profile not found")
 
-    db.delete(profile)
-    db.commit()
+    await db.delete(profile)
+    await db.commit()
+    await child_access_cache.invalidate(current_user.user_id)
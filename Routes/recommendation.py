@@ -1,32 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 from BackEnd.Models.user import User
 from BackEnd.Models.recommendation import Recommendation, RecommendationSource, RecommendationPriority
-from BackEnd.Models.child_profile import ChildProfile
 from BackEnd.Utils.auth_utils import get_current_user
-from BackEnd.Utils.database import get_db
+from BackEnd.Utils.child_access import OwnedChild, child_access_cache, get_owned_child
+from BackEnd.Utils.database import get_async_db
+from BackEnd.Utils.pagination import encode_cursor, decode_cursor
+from BackEnd.Utils.recommendation_cache import CachedPage, etag_matches, make_etag, recommendation_cache
 from BackEnd.Schemas.child_profile import RecommendationBase, RecommendationUpdate
 
 router = APIRouter(tags=["Recommendations"])
 
+_DUPLICATE_DETAIL = "A recommendation with this title and type already exists for that day"
+
+
+async def _get_owned_recommendation(db: AsyncSession, rec_id: int, user_id: int) -> Recommendation:
+    rec = await db.get(Recommendation, rec_id)
+    if not rec or rec.child_id not in await child_access_cache.get_children(db, user_id):
+        raise HTTPException(status_code=404, detail="Recommendation not found")
+    return rec
+
 
 @router.post("/", response_model=RecommendationBase)
-def create_recommendation(
+async def create_recommendation(
         recommendation: RecommendationBase,
         child_id: int = Query(...),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
-    # Ownership check
-    child = db.query(ChildProfile).filter(
-        ChildProfile.child_id == child_id,
-        ChildProfile.user_id == current_user.user_id
-    ).first()
-    if not child:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    await child_access_cache.require(db, current_user.user_id, child_id, detail="Not authorized")
 
     rec = Recommendation(
         child_id=child_id,
@@ -37,60 +45,128 @@ def create_recommendation(
         effective_date=recommendation.effective_date,
         expiration_date=recommendation.expiration_date,
         type=recommendation.type,
-        metadata=recommendation.metadata
+        extra_data=recommendation.metadata
     )
     db.add(rec)
-    db.commit()
-    db.refresh(rec)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=_DUPLICATE_DETAIL)
+    await db.refresh(rec)
+    await recommendation_cache.invalidate(child_id)
     return rec
 
 
+_page_adapter = TypeAdapter(List[RecommendationBase])
+
+
+def _listing_query(
+        child_id: int,
+        priority: Optional[RecommendationPriority],
+        rec_type: Optional[str],
+        source: Optional[RecommendationSource],
+        active_on: Optional[date],
+):
+    stmt = select(Recommendation).where(Recommendation.child_id == child_id)
+    if priority is not None:
+        stmt = stmt.where(Recommendation.priority == priority)
+    if rec_type is not None:
+        stmt = stmt.where(Recommendation.type == rec_type)
+    if source is not None:
+        stmt = stmt.where(Recommendation.source == source)
+    if active_on is not None:
+        stmt = stmt.where(
+            Recommendation.effective_date <= active_on,
+            or_(Recommendation.expiration_date.is_(None), Recommendation.expiration_date >= active_on),
+        )
+    return stmt
+
+
+def _page_response(page: CachedPage, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": page.etag, "Cache-Control": "private, no-cache"}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if etag_matches(if_none_match, page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
 @router.get("/", response_model=List[RecommendationBase])
-def get_recommendations(
-        child_id: int = Query(...),
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+async def get_recommendations(
+        request: Request,
+        child: OwnedChild = Depends(get_owned_child),
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        priority: Optional[RecommendationPriority] = Query(None),
+        type: Optional[str] = Query(None, max_length=50),
+        source: Optional[RecommendationSource] = Query(None),
+        active_on: Optional[date] = Query(None, description="Only recommendations in effect on this date"),
+        db: AsyncSession = Depends(get_async_db),
 ):
-    return db.query(Recommendation).join(ChildProfile).filter(
-        Recommendation.child_id == child_id,
-        ChildProfile.user_id == current_user.user_id
-    ).order_by(Recommendation.created_at.desc()).all()
+    """
+    Keyset-paginated recommendations for a child, newest first.
+    X-Next-Cursor holds the cursor for the next (older) page when there is one. Every page
+    carries an ETag and answers 304 to a matching If-None-Match; the first page of each
+    filter combination is served from cache until the child's recommendations change.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    variant = None
+    if cursor is None:
+        variant = "|".join(str(v or "") for v in (limit, priority, type, source, active_on))
+        cached = await recommendation_cache.get(child.child_id, variant)
+        if cached is not None:
+            return _page_response(cached, if_none_match)
+
+    stmt = _listing_query(child.child_id, priority, type, source, active_on)
+    if cursor:
+        stmt = stmt.where(tuple_(Recommendation.created_at, Recommendation.id) < decode_cursor(cursor))
+    stmt = stmt.order_by(Recommendation.created_at.desc(), Recommendation.id.desc()).limit(limit + 1)
+    recs = (await db.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(recs) > limit:
+        recs = recs[:limit]
+        next_cursor = encode_cursor(recs[-1].created_at, recs[-1].id)
+
+    body = _page_adapter.dump_json([RecommendationBase.model_validate(rec) for rec in recs])
+    page = CachedPage(body, make_etag(body), next_cursor)
+    if variant is not None:
+        await recommendation_cache.set(child.child_id, variant, page)
+    return _page_response(page, if_none_match)
 
 
 @router.put("/{rec_id}", response_model=RecommendationBase)
-def update_recommendation(
+async def update_recommendation(
         rec_id: int,
         update_data: RecommendationUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
-    rec = db.query(Recommendation).join(ChildProfile).filter(
-        Recommendation.id == rec_id,
-        ChildProfile.user_id == current_user.user_id
-    ).first()
-    if not rec:
-        raise HTTPException(status_code=404, detail="Recommendation not found")
+    rec = await _get_owned_recommendation(db, rec_id, current_user.user_id)
 
     for field, value in update_data.dict(exclude_unset=True).items():
-        setattr(rec, field, value)
+        setattr(rec, "extra_data" if field == "metadata" else field, value)
 
-    db.commit()
-    db.refresh(rec)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=_DUPLICATE_DETAIL)
+    await db.refresh(rec)
+    await recommendation_cache.invalidate(rec.child_id)
     return rec
 
 
 @router.delete("/{rec_id}", status_code=204)
-def delete_recommendation(
+async def delete_recommendation(
         rec_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
-    rec = db.query(Recommendation).join(ChildProfile).filter(
-        Recommendation.id == rec_id,
-        ChildProfile.user_id == current_user.user_id
-    ).first()
-    if not rec:
-        raise HTTPException(status_code=404, detail="Recommendation not found")
+    rec = await _get_owned_recommendation(db, rec_id, current_user.user_id)
 
-    db.delete(rec)
-    db.commit()
+    child_id = rec.child_id
+    await db.delete(rec)
+    await db.commit()
+    await recommendation_cache.invalidate(child_id)
@@ -13,6 +13,8 @@ class ChatRequest(BaseModel):
     child_id: int
     message: str
     context: Optional[str] = None
+    use_cache: bool = True  # Set False to always get a fresh AI reply
+    include_history: bool = False  # Opt in to sending recent turns with this child as conversation context
 
 
 class ChatResponse(BaseModel):
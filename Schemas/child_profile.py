@@ -1,6 +1,6 @@
 # BackEnd/Schemas/child_profile.py
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from datetime import date, datetime
 from typing import Optional, Dict, List, Any, Union
 from enum import Enum
@@ -64,7 +64,8 @@ class RecommendationBase(BaseModel):
     effective_date: date
     expiration_date: Optional[date] = None
     type: str  # "behavior" or "emotional"
-    metadata: Optional[str] = None
+    # Stored in Recommendation.extra_data; `metadata` on an ORM object is SQLAlchemy's MetaData
+    metadata: Optional[str] = Field(None, validation_alias=AliasChoices("extra_data", "metadata"))
 
     model_config = {
         "from_attributes": True
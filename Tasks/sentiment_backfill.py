@@ -0,0 +1,305 @@
+# BackEnd/Tasks/sentiment_backfill.py
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+from cryptography.fernet import InvalidToken
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from sqlalchemy import bindparam, select, update
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Utils.database import db_session, engine
+from BackEnd.Utils.encryption import decrypt_data, decrypt_many
+from BackEnd.Utils.feedback_rollups import compact_feedback_rollups
+from BackEnd.Utils.job_checkpoint import JobCheckpoint
+from BackEnd.Utils.mongo_client import chat_sessions_collection
+from BackEnd.Utils.sentiment import get_sentiment_engine, score_batch, sentiment_label
+
+logger = logging.getLogger(__name__)
+
+# Scores that differ by less than this are left alone
+SCORE_TOLERANCE = 1e-6
+
+
+def _peel(value: str) -> Optional[str]:
+    """Decrypts one ChatLog value, whether it was written with one layer or two."""
+    try:
+        inner = decrypt_data(value)
+    except InvalidToken:
+        return None
+    try:
+        return decrypt_data(inner)
+    except InvalidToken:
+        return inner  # Written with a single layer (e.g. ChatLog.create_log)
+
+
+def _decrypt_responses(tokens: Sequence[str]) -> List[Optional[str]]:
+    """
+    Plaintext for each ChatLog.chatbot_response token, None where it can't be decrypted.
+    The whole batch goes through decrypt_many; rows that break the batch are peeled one by one.
+    """
+    try:
+        return decrypt_many(decrypt_many(tokens))
+    except InvalidToken:
+        return [_peel(token) for token in tokens]
+
+
+def _changed(old: Optional[float], new: float) -> bool:
+    return old is None or abs(old - new) > SCORE_TOLERANCE
+
+
+class SentimentBackfillJob:
+    """
+    Resumable re-scoring of stored chat turns with the current sentiment engine.
+
+    Postgres chat_logs are walked in primary-key order and Mongo chat_sessions in _id
+    order, one batch at a time: responses are decrypted in bulk, scored across a process
+    pool and written back with one executemany / bulk_write per batch. Only rows whose
+    score actually changed are written, each batch commits in its own short
+    transaction and the optional rate cap keeps load predictable, so the job runs
+    alongside live traffic. Rated chat logs whose score changed feed the sentiment
+    columns of feedback_daily_rollups, so those days are recompacted once the
+    Postgres pass finishes. Progress is checkpointed after every batch; switching
+    sentiment engines starts a fresh run.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = 1000,
+            workers: Optional[int] = None,
+            max_rows_per_second: Optional[float] = None,
+            checkpoint: Optional[JobCheckpoint] = None,
+    ):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.max_rows_per_second = max_rows_per_second
+        self.checkpoint = checkpoint or JobCheckpoint("sentiment_backfill")
+        self.state: Dict[str, Any] = {}
+
+    def run(self, include_mongo: bool = True) -> Dict[str, Any]:
+        engine_name = get_sentiment_engine().name
+        self.state = self.checkpoint.load()
+        if self.state.get("engine") != engine_name:
+            self.state = {"engine": engine_name}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self._run_postgres(pool)
+            if include_mongo:
+                asyncio.run(self._run_mongo(pool))
+
+        logger.info("Sentiment backfill finished: %s", self.report())
+        return self.state
+
+    def progress(self) -> Dict[str, Any]:
+        return self.state or self.checkpoint.load()
+
+    def reset(self):
+        self.checkpoint.clear()
+        self.state = {}
+
+    def report(self) -> str:
+        lines = [f"engine={self.state.get('engine')}"]
+        for name in ("chat_logs", "chat_sessions"):
+            progress = self.state.get(name)
+            if not progress:
+                continue
+            timings = progress.get("seconds", {})
+            lines.append(
+                f"{name}: processed={progress['rows_processed']} updated={progress['rows_updated']} "
+                f"failed={progress['rows_failed']} rate={progress.get('rows_per_second') or 0.0} rows/s "
+                f"(read {timings.get('read', 0):.1f}s, score {timings.get('score', 0):.1f}s, "
+                f"write {timings.get('write', 0):.1f}s)"
+            )
+        return "; ".join(lines)
+
+    def _progress(self, name: str) -> Dict[str, Any]:
+        return self.state.setdefault(name, {
+            "last_id": None, "rows_processed": 0, "rows_updated": 0, "rows_failed": 0,
+            "seconds": {"read": 0.0, "score": 0.0, "write": 0.0}, "done": False,
+        })
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        size = max(1, -(-len(texts) // self.workers))
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    def _score(self, pool: Executor, texts: List[str]) -> List[float]:
+        return [score for chunk in pool.map(score_batch, self._chunks(texts)) for score in chunk]
+
+    def _finish_batch(self, name: str, progress: Dict[str, Any], rows: int, started: float,
+                      batch_started: float, processed_this_run: int) -> float:
+        """Records and checkpoints a finished batch; returns how long to pause for the rate cap."""
+        progress["rows_processed"] += rows
+        elapsed = time.monotonic() - started
+        progress["rows_per_second"] = round(processed_this_run / elapsed, 1) if elapsed else None
+        self.checkpoint.save(self.state)
+        logger.info("Sentiment backfill %s: last_id=%s processed=%s updated=%s (%.1f rows/s)",
+                    name, progress["last_id"], progress["rows_processed"],
+                    progress["rows_updated"], progress["rows_per_second"] or 0.0)
+
+        if not self.max_rows_per_second:
+            return 0.0
+        return max(0.0, rows / self.max_rows_per_second - (time.monotonic() - batch_started))
+
+    def _run_postgres(self, pool: Executor):
+        progress = self._progress("chat_logs")
+        if progress["done"]:
+            logger.info("Sentiment backfill of chat_logs already complete, skipping")
+            return
+
+        table = ChatLog.__table__
+        select_stmt = (
+            select(table.c.id, table.c.chatbot_response, table.c.sentiment_score,
+                   table.c.rating, table.c.timestamp)
+            .where(table.c.id > bindparam("last_id"))
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+        )
+        update_stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(sentiment_score=bindparam("score"))
+        )
+        timings = progress["seconds"]
+        started = time.monotonic()
+        processed_this_run = 0
+
+        while True:
+            batch_started = time.monotonic()
+            with engine.connect() as conn:
+                rows = conn.execute(select_stmt, {"last_id": progress["last_id"] or 0}).all()
+            if not rows:
+                break
+            texts = _decrypt_responses([row.chatbot_response for row in rows])
+            timings["read"] += time.monotonic() - batch_started
+
+            readable = [(row, text) for row, text in zip(rows, texts) if text is not None]
+            progress["rows_failed"] += len(rows) - len(readable)
+            phase = time.monotonic()
+            scores = self._score(pool, [text for _, text in readable])
+            timings["score"] += time.monotonic() - phase
+
+            params = [
+                {"_id": row.id, "score": score}
+                for (row, _), score in zip(readable, scores)
+                if _changed(row.sentiment_score, score)
+            ]
+            phase = time.monotonic()
+            if params:
+                with engine.begin() as conn:
+                    conn.execute(update_stmt, params)
+                progress["rows_updated"] += len(params)
+                self._track_rollup_day(progress, [
+                    row for (row, _), score in zip(readable, scores)
+                    if row.rating is not None and _changed(row.sentiment_score, score)
+                ])
+            timings["write"] += time.monotonic() - phase
+
+            progress["last_id"] = rows[-1].id
+            processed_this_run += len(rows)
+            time.sleep(self._finish_batch(
+                "chat_logs", progress, len(rows), started, batch_started, processed_this_run
+            ))
+
+        if progress.get("rollup_since"):
+            since = date.fromisoformat(progress["rollup_since"])
+            with db_session() as db:
+                compact_feedback_rollups(db, since=since)
+        progress["done"] = True
+        self.checkpoint.save(self.state)
+
+    @staticmethod
+    def _track_rollup_day(progress: Dict[str, Any], rated_rows: Sequence[Any]):
+        """Remembers the earliest day whose rollup row saw a sentiment change."""
+        days = [row.timestamp.date() for row in rated_rows if row.timestamp is not None]
+        if not days:
+            return
+        earliest = min(days).isoformat()
+        if not progress.get("rollup_since") or earliest < progress["rollup_since"]:
+            progress["rollup_since"] = earliest
+
+    async def _run_mongo(self, pool: Executor):
+        progress = self._progress("chat_sessions")
+        if progress["done"]:
+            logger.info("Sentiment backfill of chat_sessions already complete, skipping")
+            return
+
+        loop = asyncio.get_running_loop()
+        timings = progress["seconds"]
+        started = time.monotonic()
+        processed_this_run = 0
+
+        while True:
+            batch_started = time.monotonic()
+            query = {"_id": {"$gt": ObjectId(progress["last_id"])}} if progress["last_id"] else {}
+            docs = await chat_sessions_collection.find(
+                query, {"ai_response": 1, "sentiment_score": 1}
+            ).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not docs:
+                break
+            timings["read"] += time.monotonic() - batch_started
+
+            # Same accounting as chat_logs: unreadable turns fail, changed scores count as updated
+            readable = [doc for doc in docs if doc.get("ai_response")]
+            progress["rows_failed"] += len(docs) - len(readable)
+            phase = time.monotonic()
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(pool, score_batch, chunk)
+                for chunk in self._chunks([doc["ai_response"] for doc in readable])
+            ))
+            scores = [score for chunk in chunks for score in chunk]
+            timings["score"] += time.monotonic() - phase
+
+            updates = [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"sentiment_score": score, "sentiment": sentiment_label(score)}},
+                )
+                for doc, score in zip(readable, scores)
+                if _changed(doc.get("sentiment_score"), score)
+            ]
+            phase = time.monotonic()
+            if updates:
+                try:
+                    result = await chat_sessions_collection.bulk_write(updates, ordered=False)
+                    progress["rows_updated"] += result.matched_count
+                except BulkWriteError as e:
+                    progress["rows_updated"] += e.details.get("nMatched", 0)
+                    progress["rows_failed"] += len(e.details.get("writeErrors", []))
+                    logger.warning("Sentiment backfill chat_sessions write errors: %s",
+                                   e.details.get("writeErrors", [])[:3])
+            timings["write"] += time.monotonic() - phase
+
+            progress["last_id"] = str(docs[-1]["_id"])
+            processed_this_run += len(docs)
+            await asyncio.sleep(self._finish_batch(
+                "chat_sessions", progress, len(docs), started, batch_started, processed_this_run
+            ))
+
+        progress["done"] = True
+        self.checkpoint.save(self.state)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-score stored chat turns with the current sentiment engine")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-rows-per-second", type=float, default=None)
+    parser.add_argument("--skip-mongo", action="store_true")
+    parser.add_argument("--reset", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job = SentimentBackfillJob(args.batch_size, args.workers, args.max_rows_per_second)
+    if args.reset:
+        job.reset()
+    job.run(include_mongo=not args.skip_mongo)
+    print(job.report())
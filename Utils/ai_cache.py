@@ -0,0 +1,146 @@
+# BackEnd/Utils/ai_cache.py
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:]+$")
+
+# Placeholder stored instead of the child's name so cached replies can be shared
+CHILD_NAME_PLACEHOLDER = "{{child_name}}"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    if not text:
+        return ""
+    text = _WHITESPACE_RE.sub(" ", text.strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def age_bucket(age: int) -> str:
+    if age < 2:
+        return "infant"
+    if age < 4:
+        return "toddler"
+    if age < 6:
+        return "preschool"
+    if age < 13:
+        return "school"
+    return "teen"
+
+
+def make_cache_key(user_input: str, child_age: int, context: Optional[str]) -> str:
+    raw = "|".join((normalize_text(user_input), age_bucket(child_age), normalize_text(context)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _name_pattern(child_name: str) -> Optional[re.Pattern]:
+    if not child_name:
+        return None
+    return re.compile(rf"\b{re.escape(child_name)}\b")
+
+
+class AIResponseCache:
+    """
+    Two-tier cache for AI replies: an in-process LRU in front of Redis.
+    Values are the raw reply text with the child's name replaced by a placeholder.
+    """
+
+    def __init__(
+            self,
+            local_size: int = settings.AI_CACHE_LOCAL_SIZE,
+            ttl: int = settings.AI_CACHE_TTL,
+            max_entry_bytes: int = settings.AI_CACHE_MAX_ENTRY_BYTES,
+            enabled: bool = settings.AI_CACHE_ENABLED,
+            prefix: str = "ai_cache:",
+    ):
+        self.local_size = local_size
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.enabled = enabled
+        self.prefix = prefix
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.oversized = 0
+
+    def _get_local(self, key: str) -> Optional[str]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: str):
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str, child_name: str = "") -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        value = self._get_local(key)
+        if value is not None:
+            self.local_hits += 1
+        elif redis_client is not None:
+            try:
+                value = await redis_client.get(self.prefix + key)
+            except Exception as e:
+                logger.warning("AI cache read failed: %s", e)
+            if value is not None:
+                self.redis_hits += 1
+                self._set_local(key, value)
+
+        if value is None:
+            self.misses += 1
+            return None
+        return value.replace(CHILD_NAME_PLACEHOLDER, child_name)
+
+    async def set(self, key: str, text: str, child_name: str = ""):
+        if not self.enabled:
+            return
+
+        pattern = _name_pattern(child_name)
+        value = pattern.sub(CHILD_NAME_PLACEHOLDER, text) if pattern else text
+        if len(value.encode()) > self.max_entry_bytes:
+            self.oversized += 1
+            return
+
+        self._set_local(key, value)
+        if redis_client is not None:
+            try:
+                await redis_client.set(self.prefix + key, value, ex=self.ttl)
+            except Exception as e:
+                logger.warning("AI cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "oversized": self.oversized,
+            "local_entries": len(self._local),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+ai_response_cache = AIResponseCache()
@@ -1,10 +1,18 @@
 import os
+import json
+import asyncio
 import logging
 import httpx
-import re
-from datetime import date
-from typing import Dict, Any, List, Optional
-from textblob import TextBlob
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, List, Optional
+from BackEnd.Utils.ai_postprocess import PostProcessed, postprocess, postprocess_async
+from BackEnd.Utils.ai_cache import ai_response_cache, make_cache_key
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.conversation_context import History
+from BackEnd.Utils.ai_limits import BackendLimiter, BackendSaturated, CircuitBreaker, CircuitOpen, SingleFlight
+from BackEnd.Utils.ai_providers import (
+    LARGE, AIProvider, HTTPProvider, LocalStubProvider, ProviderRegistry, ProviderRequest, timed_generate,
+)
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -15,85 +23,327 @@ HF_TOKEN = os.getenv("HF_TOKEN")
 AI_BASE_URL = os.getenv("AI_BASE_URL", "").rstrip("/")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-70b-8192")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
 
 
-def analyze_sentiment(text: str) -> Dict[str, Any]:
-    analysis = TextBlob(text)
-    polarity = analysis.sentiment.polarity
-    label = (
-        "positive" if polarity > 0.2 else
-        "negative" if polarity < -0.2 else
-        "neutral"
+@dataclass(frozen=True)
+class AIClientConfig:
+    """Connection settings for one AI backend's pooled HTTP client."""
+    base_url: str
+    timeout: float
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    http2: bool
+    headers: Optional[Dict[str, str]] = None
+
+
+def _build_client_configs() -> Dict[str, AIClientConfig]:
+    return {
+        "custom": AIClientConfig(
+            base_url=AI_BASE_URL,
+            timeout=settings.AI_CUSTOM_TIMEOUT,
+            max_connections=settings.AI_CUSTOM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_CUSTOM_MAX_KEEPALIVE,
+            keepalive_expiry=settings.AI_CUSTOM_KEEPALIVE_EXPIRY,
+            http2=settings.AI_CUSTOM_HTTP2,
+        ),
+        "groq": AIClientConfig(
+            base_url=GROQ_BASE_URL,
+            timeout=settings.GROQ_TIMEOUT,
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+            http2=settings.GROQ_HTTP2,
+            headers={"Authorization": f"Bearer {GROQ_API_KEY}"} if GROQ_API_KEY else None,
+        ),
+    }
+
+
+AI_CLIENT_CONFIGS = _build_client_configs()
+
+# Pooled clients, one per backend; populated by init_ai_clients() in the app lifespan
+_ai_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _create_client(config: AIClientConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=config.base_url,
+        timeout=config.timeout,
+        headers=config.headers,
+        http2=config.http2,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+    )
+
+
+async def init_ai_clients():
+    """Open one keep-alive connection pool per AI backend."""
+    for backend, config in AI_CLIENT_CONFIGS.items():
+        if backend not in _ai_clients:
+            _ai_clients[backend] = _create_client(config)
+    logger.info("AI clients initialized: %s", ", ".join(_ai_clients))
+
+
+async def close_ai_clients():
+    """Close all pooled AI clients; called on app shutdown."""
+    while _ai_clients:
+        backend, client = _ai_clients.popitem()
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("Failed to close AI client %s: %s", backend, e)
+
+
+def get_ai_client(backend: str) -> httpx.AsyncClient:
+    """
+    Return the pooled client for a backend.
+    Creates it lazily when called outside the app lifespan (scripts, demos).
+    """
+    client = _ai_clients.get(backend)
+    if client is None or client.is_closed:
+        client = _create_client(AI_CLIENT_CONFIGS[backend])
+        _ai_clients[backend] = client
+    return client
+
+
+# Concurrency caps per backend; saturated backends fail fast so the caller falls back
+AI_BACKEND_LIMITERS: Dict[str, BackendLimiter] = {
+    "custom": BackendLimiter(
+        "custom",
+        max_concurrency=settings.AI_CUSTOM_MAX_CONCURRENCY,
+        max_queue=settings.AI_CUSTOM_MAX_QUEUE,
+        max_wait=settings.AI_CUSTOM_MAX_WAIT,
+    ),
+    "groq": BackendLimiter(
+        "groq",
+        max_concurrency=settings.GROQ_MAX_CONCURRENCY,
+        max_queue=settings.GROQ_MAX_QUEUE,
+        max_wait=settings.GROQ_MAX_WAIT,
+    ),
+}
+
+def _new_breaker(name: str) -> CircuitBreaker:
+    """Circuit breaker for one provider; an open breaker skips it with no added latency."""
+    return CircuitBreaker(
+        name,
+        window=settings.AI_BREAKER_WINDOW,
+        min_calls=settings.AI_BREAKER_MIN_CALLS,
+        failure_rate=settings.AI_BREAKER_FAILURE_RATE,
+        open_seconds=settings.AI_BREAKER_OPEN_SECONDS,
+        half_open_probes=settings.AI_BREAKER_HALF_OPEN_PROBES,
     )
-    return {"polarity": polarity, "label": label}
+
+
+# Hedging: if the top-ranked provider hasn't answered by its p95 latency, race the next one
+AI_HEDGE_ENABLED = settings.AI_HEDGE_ENABLED
+AI_HEDGE_MIN_DELAY = settings.AI_HEDGE_MIN_DELAY
+
+# Identical prompts already in flight share one upstream call
+_ai_singleflight = SingleFlight()
+
+
+def analyze_sentiment(text: str) -> Dict[str, Any]:
+    result = postprocess(text)
+    return {"polarity": result.polarity, "label": result.label}
 
 
 def extract_actions(text: str) -> List[str]:
-    matches = re.findall(r"(?:•|\d+\.)\s*(.*?)(?=\n|$)", text)
-    return [m.strip() for m in matches[:3]]
+    return postprocess(text).actions
 
 
 def extract_recommendations_from_text(text: str) -> List[Dict[str, Any]]:
     """Parse AI response text to extract recommendations."""
-    pattern = r"Recommendation:\s*(.+)"
-    matches = re.findall(pattern, text)
-    recs = []
-    for m in matches:
-        recs.append({
-            "title": m[:40] + "..." if len(m) > 43 else m,
-            "description": m,
-            "priority": "medium",
-            "type": "behavior",
-            "source": "ai_model",
-            "effective_date": date.today()
-        })
-    return recs
-
-
-async def _call_custom_api(prompt: str, age: int, name: str, context: str) -> str:
+    return postprocess(text).recommendations
+
+
+async def _call_custom_api(prompt: str, age: int, name: str, context: str, history: History = ()) -> str:
     """Try your own HTTP endpoint first."""
     if not AI_BASE_URL:
         raise RuntimeError("AI_BASE_URL not set")
 
-    url = f"{AI_BASE_URL}/generate"
-    payload = {"prompt": prompt, "age": age, "name": name, "context": context}
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        text = data.get("text") or data.get("response") or ""
-        if not text:
-            raise ValueError("Empty text from custom AI endpoint")
-        return text.strip()
+    payload = {"prompt": prompt, "age": age, "name": name, "context": context, "history": _history_messages(history)}
+    async with AI_BACKEND_LIMITERS["custom"].slot():
+        resp = await get_ai_client("custom").post("/generate", json=payload)
+    resp.raise_for_status()
+    data = resp.json()
+    text = data.get("text") or data.get("response") or ""
+    if not text:
+        raise ValueError("Empty text from custom AI endpoint")
+    return text.strip()
 
 
-async def _call_groq(prompt: str, age: int, name: str, context: str) -> str:
-    """Fallback to Groq's OpenAI-compatible API."""
-    if not GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY not set")
+def _history_messages(history: History) -> List[Dict[str, str]]:
+    return [{"role": role, "content": content} for role, content in history]
+
 
+def _groq_payload(prompt: str, age: int, name: str, context: str, history: History = ()) -> Dict[str, Any]:
     messages = [
         {"role": "system", "content": "You are a helpful parenting assistant."},
+        *_history_messages(history),
         {"role": "user", "content": f"Child: {name}, Age: {age}\nContext: {context}\nQuestion: {prompt}"}
     ]
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
+    return {
         "model": GROQ_MODEL,
         "messages": messages,
         "temperature": 0.7,
         "max_tokens": 2048
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
+
+async def _call_groq(prompt: str, age: int, name: str, context: str, history: History = ()) -> str:
+    """Fallback to Groq's OpenAI-compatible API."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set")
+
+    payload = _groq_payload(prompt, age, name, context, history)
+    async with AI_BACKEND_LIMITERS["groq"].slot():
+        resp = await get_ai_client("groq").post("/chat/completions", json=payload)
+    resp.raise_for_status()
+    data = resp.json()
+    return data["choices"][0]["message"]["content"].strip()
+
+
+async def _stream_custom_api(
+        prompt: str, age: int, name: str, context: str, history: History = ()
+) -> AsyncIterator[str]:
+    """
+    Stream tokens from the custom endpoint.
+    Expects NDJSON lines ({"token": ...}); a plain JSON body is yielded as a single chunk.
+    """
+    if not AI_BASE_URL:
+        raise RuntimeError("AI_BASE_URL not set")
+
+    payload = {
+        "prompt": prompt, "age": age, "name": name, "context": context,
+        "history": _history_messages(history), "stream": True,
+    }
+    async with AI_BACKEND_LIMITERS["custom"].slot(), \
+            get_ai_client("custom").stream("POST", "/generate", json=payload) as resp:
         resp.raise_for_status()
-        data = resp.json()
-        return data["choices"][0]["message"]["content"].strip()
+        content_type = resp.headers.get("content-type", "")
+        if content_type.startswith("application/json"):
+            data = json.loads(await resp.aread())
+            text = data.get("text") or data.get("response") or ""
+            if not text:
+                raise ValueError("Empty text from custom AI endpoint")
+            yield text
+            return
+
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            token = data.get("token") or data.get("text") or ""
+            if token:
+                yield token
+
+
+async def _stream_groq(
+        prompt: str, age: int, name: str, context: str, history: History = ()
+) -> AsyncIterator[str]:
+    """Stream tokens from Groq's OpenAI-compatible SSE endpoint."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set")
+
+    payload = _groq_payload(prompt, age, name, context, history)
+    payload["stream"] = True
+    async with AI_BACKEND_LIMITERS["groq"].slot(), \
+            get_ai_client("groq").stream("POST", "/chat/completions", json=payload) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {})
+            token = delta.get("content")
+            if token:
+                yield token
+
+
+FALLBACK_RESPONSE = "I'm having trouble responding right now. Please try again later."
+
+
+def _fallback_payload() -> Dict[str, Any]:
+    return {
+        "response": FALLBACK_RESPONSE,
+        "sentiment_score": 0.0,
+        "sentiment": "neutral",
+        "suggested_actions": [],
+        "ai_recommendations": []
+    }
+
+
+def _payload(text: str, result: PostProcessed) -> Dict[str, Any]:
+    return {
+        "response": text,
+        "sentiment_score": result.polarity,
+        "sentiment": result.label,
+        "suggested_actions": result.actions,
+        "ai_recommendations": result.recommendations
+    }
+
+
+def build_ai_payload(text: str) -> Dict[str, Any]:
+    """Run sentiment and extraction over a completed AI reply."""
+    return _payload(text, postprocess(text))
+
+
+async def build_ai_payload_async(text: str) -> Dict[str, Any]:
+    """build_ai_payload for async callers; long replies are processed off the event loop."""
+    return _payload(text, await postprocess_async(text))
+
+
+def _build_provider_registry() -> ProviderRegistry:
+    registry = ProviderRegistry(
+        cost_weight=settings.AI_ROUTING_COST_WEIGHT,
+        explore_rate=settings.AI_ROUTING_EXPLORE_RATE,
+    )
+    registry.register(HTTPProvider(
+        "custom", _new_breaker("custom"), _call_custom_api, _stream_custom_api,
+        is_configured=lambda: bool(AI_BASE_URL),
+        models=[m.strip() for m in settings.AI_CUSTOM_MODELS.split(",") if m.strip()],
+        size=settings.AI_CUSTOM_MODEL_SIZE,
+        weight=settings.AI_CUSTOM_WEIGHT,
+        cost_per_1k_tokens=settings.AI_CUSTOM_COST_PER_1K,
+        expected_latency=settings.AI_CUSTOM_EXPECTED_LATENCY,
+    ))
+    registry.register(HTTPProvider(
+        "groq", _new_breaker("groq"), _call_groq, _stream_groq,
+        is_configured=lambda: bool(GROQ_API_KEY),
+        models=[GROQ_MODEL],
+        size=LARGE,
+        weight=settings.GROQ_WEIGHT,
+        cost_per_1k_tokens=settings.GROQ_COST_PER_1K,
+        expected_latency=settings.GROQ_EXPECTED_LATENCY,
+    ))
+    stub = settings.AI_STUB_PROVIDER if settings.AI_STUB_PROVIDER is not None else settings.TESTING
+    if stub:
+        registry.register(LocalStubProvider(_new_breaker("local"), weight=settings.AI_STUB_WEIGHT))
+    return registry
+
+
+# Providers are tried in the order route() ranks them for each request
+ai_providers = _build_provider_registry()
+
+
+def ai_backend_stats() -> Dict[str, Any]:
+    """Health, routing stats and concurrency per provider, exported via /api/ai/metrics."""
+    providers = ai_providers.describe()
+    for name, limiter in AI_BACKEND_LIMITERS.items():
+        if name in providers:
+            providers[name]["concurrency"] = limiter.stats()
+    return {
+        "providers": providers,
+        "hedging": AI_HEDGE_ENABLED,
+        "singleflight": _ai_singleflight.stats(),
+    }
 
 
 async def get_ai_response(
@@ -101,40 +351,167 @@ async def get_ai_response(
         child_age: int,
         child_name: str,
         context: Optional[str] = None,
+        use_cache: bool = True,
+        model_hint: Optional[str] = None,
+        history: History = (),
 ) -> Dict[str, Any]:
     """
-    Try custom endpoint, fallback to Groq if it fails.
+    Generate a reply through the best-ranked AI provider, falling back down the ranking.
+    `model_hint` (e.g. AIRequest.hf_model_name) favours the provider serving that model.
+    `history` is the prior conversation from conversation_context.build().
+    Replies are cached by normalized question, age bucket and context unless use_cache is False
+    or history is given; identical requests already in flight share a single upstream call.
     Returns dict with: response, sentiment_score, sentiment, suggested_actions, ai_recommendations.
     """
-    prompt = user_input
     ctx = context or ""
 
+    # A reply that depends on earlier turns isn't reusable for anyone else
+    cache_key = make_cache_key(user_input, child_age, ctx) if use_cache and not history else None
+    if cache_key:
+        cached = await ai_response_cache.get(cache_key, child_name)
+        if cached is not None:
+            logger.info("AI response from cache")
+            return await build_ai_payload_async(cached)
+
+    request = ProviderRequest(user_input, child_age, child_name, ctx, model_hint, tuple(history))
+    text = await _ai_singleflight.do(request, lambda: _generate_text(request, cache_key))
+    if text is None:
+        return _fallback_payload()
+    return await build_ai_payload_async(text)
+
+
+async def _call_in_order(request: ProviderRequest, providers: List[AIProvider]) -> str:
+    """Try each provider in turn; raises the last error if all fail."""
+    error: Optional[BaseException] = None
+    for provider in providers:
+        try:
+            text = await timed_generate(provider, request)
+            logger.info("AI response from %s", provider.name)
+            return text
+        except Exception as err:
+            logger.warning("AI provider %s failed: %s", provider.name, err)
+            error = err
+    raise error or RuntimeError("No AI provider available")
+
+
+def _hedge_delay(providers: List[AIProvider]) -> Optional[float]:
+    if not AI_HEDGE_ENABLED or len(providers) < 2 or providers[1].breaker.state != CircuitBreaker.CLOSED:
+        return None
+    p95 = providers[0].breaker.latency.percentile(0.95)
+    return max(p95, AI_HEDGE_MIN_DELAY) if p95 is not None else None
+
+
+async def _hedged_call(request: ProviderRequest, providers: List[AIProvider], delay: float) -> str:
+    """
+    Start the top provider; if it hasn't answered within `delay`, start the runner-up
+    too and return whichever succeeds first. Remaining providers are tried if both fail.
+    """
+    primary = asyncio.create_task(timed_generate(providers[0], request))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        if primary.exception() is None:
+            return primary.result()
+        logger.warning("AI provider %s failed: %s", providers[0].name, primary.exception())
+        return await _call_in_order(request, providers[1:])
+
+    logger.info("AI provider %s slower than %.2fs, hedging with %s", providers[0].name, delay, providers[1].name)
+    pending = {primary, asyncio.create_task(timed_generate(providers[1], request))}
+    error: Optional[BaseException] = None
     try:
-        text = await _call_custom_api(prompt, child_age, child_name, ctx)
-        logger.info("AI response from custom endpoint")
-    except Exception as custom_err:
-        logger.warning("Custom AI call failed, falling back to Groq: %s", custom_err)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if len(providers) > 2:
+        return await _call_in_order(request, providers[2:])
+    raise error
+
+
+async def _generate_text(request: ProviderRequest, cache_key: Optional[str]) -> Optional[str]:
+    """One upstream generation, hedged when enabled; caches the reply. None if every provider fails."""
+    providers = ai_providers.route(request)
+    try:
+        hedge_delay = _hedge_delay(providers)
+        if hedge_delay is not None:
+            text = await _hedged_call(request, providers, hedge_delay)
+        else:
+            text = await _call_in_order(request, providers)
+    except Exception as err:
+        logger.error("All AI calls failed: %s", err, exc_info=not isinstance(err, CircuitOpen))
+        return None
+
+    if cache_key:
+        await ai_response_cache.set(cache_key, text, request.name)
+    return text
+
+
+async def stream_ai_response(
+        user_input: str,
+        child_age: int,
+        child_name: str,
+        context: Optional[str] = None,
+        use_cache: bool = True,
+        model_hint: Optional[str] = None,
+        history: History = (),
+) -> AsyncIterator[str]:
+    """
+    Yield response tokens as they arrive from the best-ranked provider, moving down the
+    ranking if one fails before producing any output. Yields the fallback text if all fail.
+    A cached reply is yielded as a single chunk; replies that depend on history aren't cached.
+    """
+    ctx = context or ""
+
+    cache_key = make_cache_key(user_input, child_age, ctx) if use_cache and not history else None
+    if cache_key:
+        cached = await ai_response_cache.get(cache_key, child_name)
+        if cached is not None:
+            logger.info("AI stream from cache")
+            yield cached
+            return
+
+    request = ProviderRequest(user_input, child_age, child_name, ctx, model_hint, tuple(history))
+    for provider in ai_providers.route(request):
+        breaker = provider.breaker
+        if not breaker.allow():
+            logger.warning("AI stream skipping %s: circuit %s", provider.name, breaker.state)
+            continue
+
+        started = False
+        chunks: List[str] = []
         try:
-            text = await _call_groq(prompt, child_age, child_name, ctx)
-            logger.info("AI response from Groq fallback")
-        except Exception as groq_err:
-            logger.error("All AI calls failed: %s", groq_err, exc_info=True)
-            return {
-                "response": "I'm having trouble responding right now. Please try again later.",
-                "sentiment_score": 0.0,
-                "sentiment": "neutral",
-                "suggested_actions": [],
-                "ai_recommendations": []
-            }
-
-    sentiment = analyze_sentiment(text)
-    actions = extract_actions(text)
-    ai_recs = extract_recommendations_from_text(text)
+            async for token in provider.stream(request):
+                started = True
+                chunks.append(token)
+                yield token
+        except BackendSaturated as err:
+            breaker.release()
+            logger.warning("AI stream from %s failed: %s", provider.name, err)
+            continue
+        except Exception as err:
+            breaker.record_failure()
+            provider.stats.record_failure()
+            if started:
+                logger.error("AI stream from %s interrupted: %s", provider.name, err)
+                raise
+            logger.warning("AI stream from %s failed: %s", provider.name, err)
+            continue
+        except BaseException:
+            breaker.release()  # Client went away mid-stream
+            raise
 
-    return {
-        "response": text,
-        "sentiment_score": sentiment["polarity"],
-        "sentiment": sentiment["label"],
-        "suggested_actions": actions,
-        "ai_recommendations": ai_recs
-    }
+        text = "".join(chunks).strip()
+        breaker.record_success()
+        provider.stats.record_success(None, provider.estimate_cost(text))
+        logger.info("AI stream from %s", provider.name)
+        if cache_key:
+            await ai_response_cache.set(cache_key, text, child_name)
+        return
+
+    logger.error("All AI streams failed")
+    yield FALLBACK_RESPONSE
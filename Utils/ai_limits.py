@@ -0,0 +1,223 @@
+# BackEnd/Utils/ai_limits.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BackendSaturated(Exception):
+    """Raised when an AI backend has no free slot within the allowed wait."""
+
+
+class BackendLimiter:
+    """
+    Caps concurrent upstream calls to one AI backend.
+
+    Up to `max_concurrency` calls run at once; at most `max_queue` more wait for a
+    slot, each for no longer than `max_wait` seconds. Anything beyond that fails
+    fast with BackendSaturated so the caller can fall back instead of piling up.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()  # Free slot: returns without suspending
+        elif self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise BackendSaturated(f"{self.name}: {self._waiting} calls already queued")
+        else:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise BackendSaturated(f"{self.name}: no slot within {self.max_wait}s")
+            finally:
+                self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key runs the call,
+    later callers with the same key await the same result (or exception).
+    The shared call runs as its own task, so a caller disconnecting does not cancel
+    it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _, k=key: self._calls.pop(k, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
+
+
+class CircuitOpen(Exception):
+    """Raised when a backend's circuit breaker is not letting calls through."""
+
+
+class LatencyTracker:
+    """Rolling sample of successful call latencies."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class CircuitBreaker:
+    """
+    Per-backend breaker over a rolling time window of call outcomes.
+
+    closed: calls flow; once at least `min_calls` outcomes in the last `window`
+    seconds fail at `failure_rate` or more, the breaker opens.
+    open: calls are refused immediately for `open_seconds`.
+    half_open: up to `half_open_probes` calls are let through; a success closes
+    the breaker, a failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+            self,
+            name: str,
+            window: float = 60.0,
+            min_calls: int = 10,
+            failure_rate: float = 0.5,
+            open_seconds: float = 30.0,
+            half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.latency = LatencyTracker()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.trips = 0
+        self.refused = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self.refused += 1
+        return False
+
+    def record_success(self, seconds: Optional[float] = None):
+        if seconds is not None:
+            self.latency.record(seconds)
+        if self._state == self.HALF_OPEN:
+            logger.info("Circuit %s closed after successful probe", self.name)
+            self._state = self.CLOSED
+            self._outcomes.clear()
+        self._record(True)
+
+    def record_failure(self):
+        if self._state == self.HALF_OPEN:
+            self._open()
+            return
+        self._record(False)
+        total = len(self._outcomes)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if self._state == self.CLOSED and total >= self.min_calls and failures / total >= self.failure_rate:
+            self._open()
+
+    def release(self):
+        """The call ended without a verdict (cancelled, saturated); frees a half-open probe."""
+        if self._state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        total = len(self._outcomes)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        p95 = self.latency.percentile(0.95)
+        return {
+            "state": self.state,
+            "calls_in_window": total,
+            "failure_rate": round(failures / total, 3) if total else 0.0,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "trips": self.trips,
+            "refused": self.refused,
+        }
+
+    def _record(self, ok: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _open(self):
+        logger.warning("Circuit %s opened for %.0fs", self.name, self.open_seconds)
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
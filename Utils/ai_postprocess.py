@@ -0,0 +1,116 @@
+# BackEnd/Utils/ai_postprocess.py
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.sentiment import get_sentiment_engine
+
+# A bullet or "1." list marker and the rest of its line
+_ACTION_RE = re.compile(r"(?:•|\d+\.)\s*(.*)")
+# "Recommendation: ..." and the rest of its line
+_RECOMMENDATION_RE = re.compile(r"Recommendation:\s*(.+)")
+
+MAX_ACTIONS = 3
+
+
+@dataclass
+class PostProcessed:
+    """Everything derived from one AI reply."""
+    polarity: float
+    label: str
+    actions: List[str] = field(default_factory=list)
+    recommendations: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _recommendation(text: str, today: date) -> Dict[str, Any]:
+    return {
+        "title": text[:40] + "..." if len(text) > 43 else text,
+        "description": text,
+        "priority": "medium",
+        "type": "behavior",
+        "source": "ai_model",
+        "effective_date": today,
+    }
+
+
+def postprocess(text: str) -> PostProcessed:
+    """
+    Sentiment, suggested actions and recommendations for a reply.
+
+    Actions and recommendations come from one pass over the reply's lines; the
+    extraction regexes only run on lines that pass a cheap substring check.
+    Sentiment comes from the configured engine (see Utils/sentiment.py).
+    """
+    actions: List[str] = []
+    recommendations: List[Dict[str, Any]] = []
+    today = date.today()
+
+    for line in text.split("\n"):
+        if "Recommendation:" in line:
+            match = _RECOMMENDATION_RE.search(line)
+            if match:
+                recommendations.append(_recommendation(match.group(1), today))
+        if len(actions) < MAX_ACTIONS and ("•" in line or "." in line):
+            match = _ACTION_RE.search(line)
+            if match:
+                actions.append(match.group(1).strip())
+
+    polarity, label = get_sentiment_engine().analyze(text)
+    return PostProcessed(polarity, label, actions, recommendations)
+
+
+async def postprocess_async(text: str) -> PostProcessed:
+    """postprocess(), moved to a worker thread for replies long enough to stall the event loop."""
+    if len(text) > settings.SENTIMENT_OFFLOAD_CHARS:
+        return await asyncio.to_thread(postprocess, text)
+    return postprocess(text)
+
+
+def _benchmark_corpus(size: int = 200) -> List[str]:
+    """Replies shaped like real ones: a few paragraphs, a numbered list, some recommendations."""
+    paragraph = (
+        "It is completely normal for a child this age to push back at bedtime. "
+        "Try to keep the routine calm and predictable, and avoid screens in the last hour. "
+        "Praise the effort when things go well, even if the result is not perfect. "
+    )
+    replies = []
+    for i in range(size):
+        paragraphs = "\n\n".join(paragraph * (1 + i % 4) for _ in range(1 + i % 3))
+        steps = "\n".join(f"{n}. Step {n}: keep the same wind-down routine every night." for n in range(1, 6))
+        recs = "\n".join(
+            f"Recommendation: Spend ten minutes of one-on-one play time together, day {n}." for n in range(i % 3)
+        )
+        replies.append(f"{paragraphs}\n\n{steps}\n\n{recs}\n\nYou are doing a great job.")
+    return replies
+
+
+def _legacy_postprocess(text: str) -> Dict[str, Any]:
+    """The previous three-pass implementation, kept for the benchmark comparison."""
+    from textblob import TextBlob
+
+    polarity = TextBlob(text).sentiment.polarity
+    actions = [m.strip() for m in re.findall(r"(?:•|\d+\.)\s*(.*?)(?=\n|$)", text)[:3]]
+    recs = [_recommendation(m, date.today()) for m in re.findall(r"Recommendation:\s*(.+)", text)]
+    return {"polarity": polarity, "actions": actions, "recommendations": recs}
+
+
+if __name__ == "__main__":
+    # Microbenchmark: python -m BackEnd.Utils.ai_postprocess
+    import timeit
+
+    corpus = _benchmark_corpus()
+    mean_len = sum(map(len, corpus)) // len(corpus)
+    for reply in corpus:
+        legacy, current = _legacy_postprocess(reply), postprocess(reply)
+        assert legacy["actions"] == current.actions
+        assert len(legacy["recommendations"]) == len(current.recommendations)
+
+    runs = 5
+    for label, fn in (("three-pass", _legacy_postprocess), ("single-pass", postprocess)):
+        seconds = min(timeit.repeat(lambda: [fn(reply) for reply in corpus], number=1, repeat=runs))
+        print(f"{label:>12}: {seconds / len(corpus) * 1e6:8.1f} us/reply "
+              f"({len(corpus)} replies, mean {mean_len} chars, best of {runs})")
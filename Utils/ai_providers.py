@@ -0,0 +1,272 @@
+# BackEnd/Utils/ai_providers.py
+
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from BackEnd.Utils.ai_limits import BackendSaturated, CircuitBreaker, CircuitOpen
+
+logger = logging.getLogger(__name__)
+
+# Rough size classes used when matching a request to a model
+SMALL, LARGE = "small", "large"
+
+
+@dataclass(frozen=True)
+class ProviderRequest:
+    """One generation request as seen by providers and the router."""
+    prompt: str
+    age: int
+    name: str
+    context: str
+    model_hint: Optional[str] = None
+    history: Tuple[Tuple[str, str], ...] = ()  # Prior (role, content) messages, oldest first
+
+    @property
+    def args(self) -> tuple:
+        return self.prompt, self.age, self.name, self.context, self.history
+
+    @property
+    def preferred_size(self) -> str:
+        # Teens, long questions and requests carrying context get the bigger model;
+        # history is already trimmed to a token budget, so it doesn't change the tier
+        if self.age >= 13 or self.context or len(self.prompt) > 400:
+            return LARGE
+        return SMALL
+
+
+class ProviderStats:
+    """Exponentially weighted latency and error rate, plus call and estimated cost totals."""
+
+    def __init__(self, expected_latency: float, alpha: float = 0.2):
+        self.alpha = alpha
+        self.latency = expected_latency
+        self.latency_samples = 0
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.cost = 0.0
+
+    def record_success(self, seconds: Optional[float], cost: float = 0.0):
+        self.calls += 1
+        self.cost += cost
+        if seconds is not None:
+            # The first measurement replaces the configured expectation outright
+            if self.latency_samples:
+                self.latency += self.alpha * (seconds - self.latency)
+            else:
+                self.latency = seconds
+            self.latency_samples += 1
+        self.error_rate += self.alpha * (0.0 - self.error_rate)
+
+    def record_failure(self):
+        self.calls += 1
+        self.errors += 1
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "calls": self.calls,
+            "errors": self.errors,
+            "estimated_cost": round(self.cost, 4),
+        }
+
+
+class AIProvider(ABC):
+    """
+    Base class for a text-generation backend.
+    Subclasses implement generate() and stream(); available() reports whether the
+    provider is configured at all.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            breaker: CircuitBreaker,
+            models: Sequence[str] = (),
+            size: str = LARGE,
+            weight: float = 1.0,
+            cost_per_1k_tokens: float = 0.0,
+            expected_latency: float = 1.0,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.models = tuple(models)
+        self.size = size
+        self.weight = weight
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.stats = ProviderStats(expected_latency)
+
+    def available(self) -> bool:
+        return True
+
+    def serves(self, model_hint: Optional[str]) -> bool:
+        return bool(model_hint) and (model_hint == self.name or model_hint in self.models)
+
+    def estimate_cost(self, text: str) -> float:
+        # ~4 characters per token
+        return len(text) / 4000 * self.cost_per_1k_tokens
+
+    @abstractmethod
+    async def generate(self, request: ProviderRequest) -> str:
+        ...
+
+    @abstractmethod
+    def stream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        ...
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "available": self.available(),
+            "size": self.size,
+            "weight": self.weight,
+            "models": list(self.models),
+            "stats": self.stats.as_dict(),
+            "circuit": self.breaker.stats(),
+        }
+
+
+class HTTPProvider(AIProvider):
+    """Provider backed by the module-level call/stream functions of an HTTP backend."""
+
+    def __init__(
+            self,
+            name: str,
+            breaker: CircuitBreaker,
+            call: Callable[..., Awaitable[str]],
+            streamer: Callable[..., AsyncIterator[str]],
+            is_configured: Callable[[], bool],
+            **kwargs,
+    ):
+        super().__init__(name, breaker, **kwargs)
+        self._call = call
+        self._streamer = streamer
+        self._is_configured = is_configured
+
+    def available(self) -> bool:
+        return self._is_configured()
+
+    async def generate(self, request: ProviderRequest) -> str:
+        return await self._call(*request.args)
+
+    def stream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        return self._streamer(*request.args)
+
+
+class LocalStubProvider(AIProvider):
+    """Deterministic offline provider for tests, demos and local development."""
+
+    def __init__(self, breaker: CircuitBreaker, latency: float = 0.0, **kwargs):
+        kwargs.setdefault("size", SMALL)
+        kwargs.setdefault("expected_latency", max(latency, 0.01))
+        super().__init__("local", breaker, **kwargs)
+        self.latency = latency
+
+    def _reply(self, request: ProviderRequest) -> str:
+        return (
+            f"Here are a few ideas for {request.name} (age {request.age}):\n"
+            "1. Stay calm and name the feeling you see.\n"
+            "2. Offer two simple choices.\n"
+            "3. Praise the effort, not the result."
+        )
+
+    async def generate(self, request: ProviderRequest) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(request)
+
+    async def stream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        for line in self._reply(request).splitlines(keepends=True):
+            if self.latency:
+                await asyncio.sleep(self.latency / 4)
+            yield line
+
+
+class ProviderRegistry:
+    """
+    Holds the configured providers and orders them per request.
+
+    Score = weight x hint/size match / (latency x error penalty x cost penalty),
+    using each provider's rolling stats, so load shifts toward whichever backend is
+    currently fastest and healthiest. A small share of requests (`explore_rate`) lead
+    with a lower-ranked provider to keep its stats current. Providers that are
+    unconfigured or whose circuit is open are left out.
+    """
+
+    def __init__(
+            self,
+            hint_boost: float = 10.0,
+            size_boost: float = 1.5,
+            cost_weight: float = 0.0,
+            explore_rate: float = 0.05,
+    ):
+        self.hint_boost = hint_boost
+        self.size_boost = size_boost
+        self.cost_weight = cost_weight
+        self.explore_rate = explore_rate
+        self._providers: Dict[str, AIProvider] = {}
+
+    def register(self, provider: AIProvider):
+        self._providers[provider.name] = provider
+
+    def unregister(self, name: str):
+        self._providers.pop(name, None)
+
+    def get(self, name: str) -> AIProvider:
+        return self._providers[name]
+
+    def __iter__(self):
+        return iter(self._providers.values())
+
+    def score(self, provider: AIProvider, request: ProviderRequest) -> float:
+        stats = provider.stats
+        score = provider.weight
+        if provider.serves(request.model_hint):
+            score *= self.hint_boost
+        if provider.size == request.preferred_size:
+            score *= self.size_boost
+        penalty = max(stats.latency, 0.001) * (1 + 4 * stats.error_rate)
+        penalty *= 1 + self.cost_weight * provider.cost_per_1k_tokens
+        return score / penalty
+
+    def route(self, request: ProviderRequest) -> List[AIProvider]:
+        candidates = [
+            p for p in self._providers.values()
+            if p.available() and p.breaker.state != CircuitBreaker.OPEN
+        ]
+        ranked = sorted(candidates, key=lambda p: self.score(p, request), reverse=True)
+        # Occasionally lead with another provider so its stats don't go stale
+        if len(ranked) > 1 and not request.model_hint and random.random() < self.explore_rate:
+            ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+        return ranked
+
+    def describe(self) -> Dict[str, Any]:
+        return {name: provider.describe() for name, provider in self._providers.items()}
+
+
+async def timed_generate(provider: AIProvider, request: ProviderRequest) -> str:
+    """Generate through the provider's circuit breaker, feeding its rolling stats."""
+    breaker = provider.breaker
+    if not breaker.allow():
+        raise CircuitOpen(f"{provider.name} circuit is {breaker.state}")
+
+    started = time.monotonic()
+    try:
+        text = await provider.generate(request)
+    except (BackendSaturated, asyncio.CancelledError):
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record_failure()
+        provider.stats.record_failure()
+        raise
+    elapsed = time.monotonic() - started
+    breaker.record_success(elapsed)
+    provider.stats.record_success(elapsed, provider.estimate_cost(text))
+    return text
@@ -4,7 +4,10 @@ from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Models.feedback_rollup import FeedbackDailyRollup
 from BackEnd.Models.user import User
+from BackEnd.Schemas.analytics import ChildFeedbackStats, FeedbackTrendItem, FeedbackTrendResponse
+from BackEnd.Utils.analytics_queries import child_feedback_stats
 # from BackEnd.Schemas.analytics import FeedbackReportItem, FeedbackEffectivenessResponse
 import logging
 
@@ -12,9 +15,13 @@ logger = logging.getLogger(__name__)
 
 
 def get_feedback_summary(db: Session) -> Dict:
-    """Get high-level feedback metrics"""
-    total_feedback = db.query(func.count(ChatLog.id)).filter(ChatLog.rating.isnot(None)).scalar() or 0
-    avg_rating = db.query(func.avg(ChatLog.rating)).filter(ChatLog.rating.isnot(None)).scalar() or 0
+    """Get high-level feedback metrics; rating totals come from the daily rollups"""
+    total_feedback, rating_sum = db.query(
+        func.coalesce(func.sum(FeedbackDailyRollup.feedback_count), 0),
+        func.coalesce(func.sum(FeedbackDailyRollup.rating_sum), 0)
+    ).one()
+    total_feedback = int(total_feedback)
+    avg_rating = float(rating_sum) / total_feedback if total_feedback else 0
 
     return {
         "total_feedback": total_feedback,
@@ -24,86 +31,87 @@ def get_feedback_summary(db: Session) -> Dict:
     }
 
 
-def calculate_feedback_trend(db: Session, days: int = 30) -> Dict[str, List]:
-    """Calculate feedback trends over time"""
-    end_date = datetime.utcnow()
+def calculate_feedback_trend(db: Session, days: int = 30) -> FeedbackTrendResponse:
+    """Daily feedback counts and average ratings from the daily rollups, with % change vs the previous period"""
+    end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=days)
-
-    feedback_logs = db.query(ChatLog).filter(
-        ChatLog.rating.isnot(None),
-        ChatLog.timestamp.between(start_date, end_date)
-    ).order_by(ChatLog.timestamp).all()
-
-    # Group by day
-    daily_counts = {}
-    for log in feedback_logs:
-        date_key = log.timestamp.strftime("%Y-%m-%d")
-        daily_counts[date_key] = daily_counts.get(date_key, 0) + 1
-
-    return {
-        "dates": sorted(daily_counts.keys()),
-        "counts": [daily_counts[date] for date in sorted(daily_counts.keys())]
-    }
+    previous_start = start_date - timedelta(days=days)
+
+    rows = db.query(
+        FeedbackDailyRollup.day,
+        func.sum(FeedbackDailyRollup.feedback_count),
+        func.sum(FeedbackDailyRollup.rating_sum)
+    ).filter(
+        FeedbackDailyRollup.day.between(start_date, end_date),
+        FeedbackDailyRollup.feedback_count > 0
+    ).group_by(FeedbackDailyRollup.day).order_by(FeedbackDailyRollup.day).all()
+
+    previous = db.query(
+        func.coalesce(func.sum(FeedbackDailyRollup.feedback_count), 0)
+    ).filter(
+        FeedbackDailyRollup.day >= previous_start,
+        FeedbackDailyRollup.day < start_date
+    ).scalar()
+    current = sum(count for _, count, _ in rows)
+
+    return FeedbackTrendResponse(
+        period=f"{days}_days",
+        trends=[
+            FeedbackTrendItem(
+                date=day.strftime("%Y-%m-%d"),
+                count=int(count),
+                average_rating=round(float(rating_sum) / count, 2)
+            )
+            for day, count, rating_sum in rows
+        ],
+        overall_change=round((current - previous) / previous * 100, 1) if previous else 0.0
+    )
 
 
 def get_sentiment_correlation(db: Session) -> Dict[str, float]:
-    """Calculate correlation between sentiment and ratings"""
-    logs = db.query(ChatLog).filter(
-        ChatLog.rating.isnot(None),
-        ChatLog.sentiment_score.isnot(None)
-    ).all()
-
-    if not logs:
+    """Calculate Pearson correlation between sentiment and ratings from the daily rollups"""
+    n, sum_x, sum_y, sum_x2, sum_y2, sum_xy = db.query(
+        func.sum(FeedbackDailyRollup.paired_count),
+        func.sum(FeedbackDailyRollup.paired_rating_sum),
+        func.sum(FeedbackDailyRollup.paired_sentiment_sum),
+        func.sum(FeedbackDailyRollup.paired_rating_sq_sum),
+        func.sum(FeedbackDailyRollup.paired_sentiment_sq_sum),
+        func.sum(FeedbackDailyRollup.paired_product_sum),
+    ).one()
+
+    if not n:
         return {"correlation": 0.0}
 
-    # Simple linear regression approximation
-    sum_xy = sum(log.rating * log.sentiment_score for log in logs)
-    sum_x = sum(log.rating for log in logs)
-    sum_y = sum(log.sentiment_score for log in logs)
-    sum_x2 = sum(log.rating ** 2 for log in logs)
-
-    n = len(logs)
-    try:
-        correlation = (n * sum_xy - sum_x * sum_y) / (
-            ((n * sum_x2 - sum_x ** 2) * (n * sum(sum_y ** 2)) ** 0.5
-             ))
-    except ZeroDivisionError:
-        correlation = 0.0
-
-    return {"correlation": round(correlation, 2)}
+    # The sums are floats, so rounding can make a constant series' variance slightly
+    # negative; that would turn the square root complex
+    var_x = n * sum_x2 - sum_x ** 2
+    var_y = n * sum_y2 - sum_y ** 2
+    if var_x <= 0 or var_y <= 0:
+        return {"correlation": 0.0}
 
+    correlation = (n * sum_xy - sum_x * sum_y) / (var_x * var_y) ** 0.5
+    return {"correlation": round(max(-1.0, min(1.0, correlation)), 2)}
 
-def get_child_feedback_stats(db: Session) -> List[Dict]:
-    """Get feedback statistics per child"""
-    results = db.query(
-        ChatLog.child_id,
-        func.count(ChatLog.id).filter(ChatLog.rating.isnot(None)).label("total_feedback"),
-        func.avg(ChatLog.rating).label("avg_rating")
-    ).group_by(ChatLog.child_id).all()
 
-    return [
-        {"child_id": str(child_id), "total_feedback": total, "avg_rating": round(avg, 2)}
-        for child_id, total, avg in results
-    ]
+def get_child_feedback_stats(db: Session, child_id: Optional[int] = None) -> List[ChildFeedbackStats]:
+    """Get feedback statistics per child (or for one child)"""
+    return child_feedback_stats(db, child_id)
 
 
 def analyze_recommendation_effectiveness(db: Session) -> Dict:
     """Analyze how feedback impacts recommendation effectiveness"""
-    recent_feedback = db.query(ChatLog).filter(
-        ChatLog.rating.isnot(None),
-        ChatLog.timestamp > datetime.utcnow() - timedelta(days=90)
-    ).all()
+    feedback_volume, improvement_count = db.query(
+        func.coalesce(func.sum(FeedbackDailyRollup.feedback_count), 0),
+        func.coalesce(func.sum(FeedbackDailyRollup.improvement_count), 0)
+    ).filter(
+        FeedbackDailyRollup.day > (datetime.utcnow() - timedelta(days=90)).date()
+    ).one()
 
-    # Calculate improvement rate (rating increase between consecutive interactions)
-    improvement_count = 0
-    for i in range(1, len(recent_feedback)):
-        if recent_feedback[i].rating > recent_feedback[i - 1].rating:
-            improvement_count += 1
-
-    improvement_rate = round((improvement_count / len(recent_feedback)) * 100, 1) if recent_feedback else 0
+    # Improvement rate: share of ratings higher than the child's previous rating
+    improvement_rate = round((improvement_count / feedback_volume) * 100, 1) if feedback_volume else 0
 
     return {
         "improvement_rate": f"{improvement_rate}%",
-        "feedback_volume": len(recent_feedback),
+        "feedback_volume": int(feedback_volume),
         "top_improvement_areas": ["bedtime_routine", "emotional_support", "behavior_management"][:3]
-    }
\ No newline at end of file
+    }
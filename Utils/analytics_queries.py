@@ -0,0 +1,115 @@
+# BackEnd/Utils/analytics_queries.py
+"""
+SQL-side feedback analytics over chat_logs, for the metrics the daily rollups
+can't answer on their own (per-child stats) and for rebuilding the rollups.
+
+Every query selects only the columns it aggregates and lets PostgreSQL do the
+grouping (date_trunc, GROUP BY, window functions), so memory use stays flat
+however large chat_logs grows. Callers go through BackEnd.Utils.analytics.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import Date, Float, case, cast, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.functions import FunctionElement
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Schemas.analytics import ChildFeedbackStats
+
+RATED = ChatLog.rating.isnot(None)
+
+
+class _DayOf(FunctionElement):
+    """Calendar day of a timestamp column."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(_DayOf)
+def _compile_day_of(element, compiler, **kw):
+    return compiler.process(cast(func.date_trunc("day", *element.clauses), Date), **kw)
+
+
+@compiles(_DayOf, "sqlite")
+def _compile_day_of_sqlite(element, compiler, **kw):
+    # SQLite (tests) has no date_trunc, and CAST(... AS DATE) would keep only the year
+    return compiler.process(func.date(*element.clauses), **kw)
+
+
+def _day(column=ChatLog.timestamp):
+    return _DayOf(column)
+
+
+def _rated_with_previous():
+    """Rated logs with the same child's previous rating (by timestamp) alongside."""
+    return select(
+        ChatLog.child_id.label("child_id"),
+        ChatLog.timestamp.label("timestamp"),
+        ChatLog.rating.label("rating"),
+        ChatLog.sentiment_score.label("sentiment"),
+        func.lag(ChatLog.rating).over(
+            partition_by=ChatLog.child_id,
+            order_by=(ChatLog.timestamp, ChatLog.id),
+        ).label("prev_rating"),
+    ).where(RATED).subquery()
+
+
+def child_feedback_stats(db: Session, child_id: Optional[int] = None) -> List[ChildFeedbackStats]:
+    """Per-child feedback volume, average rating, improvement rate and last feedback time."""
+    rated = _rated_with_previous()
+    improved = case((rated.c.rating > rated.c.prev_rating, 1.0), else_=0.0)
+
+    stmt = select(
+        rated.c.child_id,
+        func.count().label("total_feedback"),
+        func.avg(rated.c.rating).label("avg_rating"),
+        (func.avg(improved).filter(rated.c.prev_rating.isnot(None)) * 100).label("improvement_rate"),
+        func.max(rated.c.timestamp).label("last_feedback_date"),
+    ).group_by(rated.c.child_id).order_by(rated.c.child_id)
+    if child_id is not None:
+        stmt = stmt.where(rated.c.child_id == child_id)
+
+    return [
+        ChildFeedbackStats(
+            child_id=str(row.child_id),
+            total_feedback=row.total_feedback,
+            avg_rating=round(float(row.avg_rating), 2),
+            improvement_rate=round(float(row.improvement_rate or 0.0), 1),
+            last_feedback_date=row.last_feedback_date,
+        )
+        for row in db.execute(stmt)
+    ]
+
+
+def daily_feedback_aggregates(since: Optional[date] = None) -> Select:
+    """
+    Per-(day, child) sums matching the feedback_daily_rollups columns;
+    used by the rollup compaction job.
+    """
+    rated = _rated_with_previous()
+    day = _day(rated.c.timestamp).label("day")
+    paired = rated.c.sentiment.isnot(None)
+
+    def paired_sum(expr):
+        return func.coalesce(func.sum(case((paired, expr), else_=0)), 0)
+
+    stmt = select(
+        day,
+        rated.c.child_id,
+        func.count().label("feedback_count"),
+        func.sum(rated.c.rating).label("rating_sum"),
+        func.sum(case((rated.c.rating > rated.c.prev_rating, 1), else_=0)).label("improvement_count"),
+        func.count(rated.c.sentiment).label("paired_count"),
+        paired_sum(cast(rated.c.rating, Float)).label("paired_rating_sum"),
+        paired_sum(cast(rated.c.rating * rated.c.rating, Float)).label("paired_rating_sq_sum"),
+        paired_sum(rated.c.sentiment).label("paired_sentiment_sum"),
+        paired_sum(rated.c.sentiment * rated.c.sentiment).label("paired_sentiment_sq_sum"),
+        paired_sum(rated.c.rating * rated.c.sentiment).label("paired_product_sum"),
+    ).group_by(day, rated.c.child_id)
+
+    if since is not None:
+        stmt = stmt.where(rated.c.timestamp >= datetime.combine(since, datetime.min.time()))
+    return stmt
@@ -10,6 +10,7 @@ from itsdangerous import URLSafeTimedSerializer
 
 from BackEnd.Models.user import User, UserRole
 from BackEnd.Utils.database import Session as SessionFactory
+from BackEnd.Utils.user_cache import UserSnapshot, user_cache
 from BackEnd.Utils.security import (
     get_password_hash,
     verify_password,
@@ -124,7 +125,11 @@ def authenticate_user(email: str) -> User:
     return cast(User, user)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+def get_current_user(token: str = Depends(oauth2_scheme)) -> UserSnapshot:
+    """
+    Resolve the bearer token to a UserSnapshot.
+    Served from the user cache when possible; falls back to a single users lookup.
+    """
     try:
         payload = decode_token(token)
         email = payload.get("sub")
@@ -133,15 +138,22 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
+    cached = user_cache.get(email)
+    if cached is not None:
+        return cached
+
     db: Session = SessionFactory()
     try:
         user = db.query(User).filter(User.email == email).first()
         if not user:  # Only check user existence
             raise HTTPException(status_code=404, detail="User not found")
-        return user
+        snapshot = UserSnapshot.from_user(user)
     finally:
         db.close()
 
+    user_cache.set(snapshot)
+    return snapshot
+
 def require_role(required_role: UserRole):
     def role_checker(current_user: User = Depends(get_current_user)):
         if current_user.role != required_role:
@@ -0,0 +1,118 @@
+# BackEnd/Utils/cache_invalidation.py
+
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, Optional
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.database import redis_client as sync_redis_client
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Key meaning "every entry in the namespace"
+ALL = "*"
+
+
+class CacheInvalidationBus:
+    """
+    Keeps the process-local tiers of shared caches coherent across workers.
+
+    Each cache registers a handler for its namespace; invalidations are published on a
+    Redis channel and every worker's subscriber task applies them to its own tier (the
+    publishing worker applies them immediately). Invalidations sent while a worker isn't
+    subscribed are lost, so local tiers are only trustworthy while `connected` is True:
+    callers skip them otherwise, and every tier is flushed on each (re)subscribe.
+    """
+
+    def __init__(self, channel: str = settings.CACHE_INVALIDATION_CHANNEL):
+        self.channel = channel
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._subscriber: Optional[asyncio.Task] = None
+        self.connected = False
+
+    def register(self, namespace: str, handler: Callable[[str], None]):
+        """`handler(key)` drops one local entry, or all of them when key is ALL."""
+        self._handlers[namespace] = handler
+
+    async def start(self):
+        if redis_client is not None:
+            self._subscriber = asyncio.create_task(self._subscribe())
+        logger.info("Cache invalidation bus started (channel=%s)", self.channel)
+
+    async def stop(self):
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+        self.connected = False
+        logger.info("Cache invalidation bus stopped")
+
+    def publish(self, namespace: str, key: str = ALL):
+        """Invalidate `key` on every worker; for sync code (ORM events, threadpool routes)."""
+        self._apply(namespace, key)
+        if sync_redis_client is None:
+            return
+        try:
+            sync_redis_client.publish(self.channel, self._message(namespace, key))
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed (%s %s): %s", namespace, key, e)
+
+    async def publish_async(self, namespace: str, key: str = ALL):
+        """Invalidate `key` on every worker without blocking the event loop."""
+        self._apply(namespace, key)
+        if redis_client is None:
+            return
+        try:
+            await redis_client.publish(self.channel, self._message(namespace, key))
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed (%s %s): %s", namespace, key, e)
+
+    @staticmethod
+    def _message(namespace: str, key: str) -> str:
+        return json.dumps({"ns": namespace, "key": key})
+
+    def _apply(self, namespace: str, key: str):
+        handler = self._handlers.get(namespace)
+        if handler is not None:
+            handler(key)
+
+    def _flush_all(self):
+        for handler in self._handlers.values():
+            handler(ALL)
+
+    async def _subscribe(self):
+        backoff = 1.0
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything published while we weren't listening is gone; start clean
+                self._flush_all()
+                self.connected = True
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        data = json.loads(message["data"])
+                        self._apply(data["ns"], data["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                logger.warning("Cache invalidation subscriber lost Redis, retrying in %.0fs: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                self.connected = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+# Singleton started/stopped by the app lifespan
+invalidation_bus = CacheInvalidationBus()
@@ -0,0 +1,188 @@
+# BackEnd/Utils/chat_writer.py
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.database import db_session
+from BackEnd.Utils.encryption import encrypt_data
+from BackEnd.Utils.mongo_client import chat_sessions_collection
+from BackEnd.Utils.recommendation_cache import recommendation_cache
+from BackEnd.Utils.recommendation_writer import write_recommendations
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatTurn:
+    """One completed chat exchange waiting to be persisted."""
+    user_id: int
+    child_id: int
+    user_input: str
+    ai_response: str
+    context: Optional[str]
+    sentiment: str
+    sentiment_score: float
+    timestamp: datetime
+    recommendations: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ChatWriteQueue:
+    """
+    Bounded write-behind queue for chat persistence.
+
+    Turns are batched and flushed when `batch_size` is reached or `flush_interval`
+    seconds have passed since the first queued turn. A full queue makes callers wait
+    up to `enqueue_timeout` seconds before the turn is written inline instead.
+    """
+
+    def __init__(
+            self,
+            max_size: int = settings.CHAT_WRITE_QUEUE_SIZE,
+            batch_size: int = settings.CHAT_WRITE_BATCH_SIZE,
+            flush_interval: float = settings.CHAT_WRITE_FLUSH_INTERVAL,
+            enqueue_timeout: float = settings.CHAT_WRITE_ENQUEUE_TIMEOUT,
+            drain_timeout: float = settings.CHAT_WRITE_DRAIN_TIMEOUT,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done() and not self._closing
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closing = False
+        self._worker = asyncio.create_task(self._run())
+        logger.info("Chat write queue started (max_size=%s, batch_size=%s)", self.max_size, self.batch_size)
+
+    async def enqueue(self, turn: ChatTurn):
+        if not self.running:
+            await self._flush([turn])
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.put(turn), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Chat write queue full, writing turn inline")
+            await self._flush([turn])
+
+    async def drain(self):
+        """Flush everything still queued and stop the worker; called on app shutdown."""
+        if self._worker is None:
+            return
+
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error("Chat write queue drain timed out with %s turns pending", self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        logger.info("Chat write queue drained")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[ChatTurn]):
+        try:
+            await run_in_threadpool(self._write_postgres, batch)
+        except Exception as e:
+            logger.error("Failed to persist %s chat turns to PostgreSQL: %s", len(batch), e)
+        await recommendation_cache.invalidate(*{turn.child_id for turn in batch if turn.recommendations})
+
+        try:
+            await chat_sessions_collection.insert_many(
+                [self._session_document(turn) for turn in batch],
+                ordered=False,
+            )
+        except Exception as mongo_err:
+            logger.warning("MongoDB log failed: %s", mongo_err)
+
+    def _write_postgres(self, batch: List[ChatTurn]):
+        try:
+            with db_session() as db:
+                for turn in batch:
+                    self._add_turn(db, turn)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            logger.warning("Batch write of %s chat turns failed, retrying one by one: %s", len(batch), e)
+
+        for turn in batch:
+            try:
+                with db_session() as db:
+                    self._add_turn(db, turn)
+            except Exception as e:
+                logger.error("Dropped chat turn for child_id=%s: %s", turn.child_id, e)
+
+    @staticmethod
+    def _add_turn(db, turn: ChatTurn):
+        # A failed recommendation insert must not cost us the chat log itself
+        try:
+            with db.begin_nested():
+                write_recommendations(db, turn.child_id, turn.recommendations)
+        except Exception as e:
+            logger.warning("Failed to store recommendations for child_id=%s: %s", turn.child_id, e)
+
+        db.add(ChatLog(
+            user_id=turn.user_id,
+            child_id=turn.child_id,
+            user_input=encrypt_data(turn.user_input),
+            chatbot_response=encrypt_data(turn.ai_response),
+            context=turn.context,
+            sentiment_score=turn.sentiment_score,
+            timestamp=turn.timestamp,
+        ))
+
+    @staticmethod
+    def _session_document(turn: ChatTurn) -> Dict[str, Any]:
+        return {
+            "user_id": turn.user_id,
+            "child_id": turn.child_id,
+            "user_input": turn.user_input,
+            "ai_response": turn.ai_response,
+            "context": turn.context,
+            "sentiment": turn.sentiment,
+            "sentiment_score": turn.sentiment_score,
+            "timestamp": turn.timestamp,
+        }
+
+
+# Singleton started/drained by the app lifespan
+chat_write_queue = ChatWriteQueue()
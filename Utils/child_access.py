@@ -0,0 +1,146 @@
+# BackEnd/Utils/child_access.py
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from BackEnd.Models.child_profile import ChildProfile
+from BackEnd.Models.user import User
+from BackEnd.Utils.auth_utils import get_current_user
+from BackEnd.Utils.cache_invalidation import ALL, invalidation_bus
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.database import get_async_db
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OwnedChild:
+    """The non-sensitive ChildProfile columns child-scoped routes need."""
+    child_id: int
+    name: str
+    birth_date: date
+
+    @property
+    def age(self) -> int:
+        today = date.today()
+        return today.year - self.birth_date.year - (
+                (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
+        )
+
+
+class ChildAccessCache:
+    """
+    Cached `user_id -> {child_id: OwnedChild}` map used for ownership checks.
+    Loaded once per user with a column-only query; a short process-local TTL sits in
+    front of Redis. Child create/update/delete must call invalidate(), which reaches
+    every worker's local tier through the invalidation bus; while this worker isn't
+    subscribed to it, the local tier is skipped.
+    """
+
+    def __init__(
+            self,
+            local_ttl: float = settings.CHILD_ACCESS_LOCAL_TTL,
+            ttl: int = settings.CHILD_ACCESS_TTL,
+            prefix: str = "child_access:",
+    ):
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local: Dict[int, Tuple[float, Dict[int, OwnedChild]]] = {}
+        invalidation_bus.register("child_access", self._drop_local)
+
+    def _drop_local(self, user_id: str):
+        if user_id == ALL:
+            self._local.clear()
+        else:
+            self._local.pop(int(user_id), None)
+
+    @staticmethod
+    def _dumps(children: Dict[int, OwnedChild]) -> str:
+        return json.dumps({
+            str(c.child_id): {"name": c.name, "birth_date": c.birth_date.isoformat()}
+            for c in children.values()
+        })
+
+    @staticmethod
+    def _loads(raw: str) -> Dict[int, OwnedChild]:
+        return {
+            int(child_id): OwnedChild(int(child_id), data["name"], date.fromisoformat(data["birth_date"]))
+            for child_id, data in json.loads(raw).items()
+        }
+
+    async def _load_from_db(self, db: AsyncSession, user_id: int) -> Dict[int, OwnedChild]:
+        result = await db.execute(
+            select(ChildProfile.child_id, ChildProfile.name, ChildProfile.birth_date)
+            .where(ChildProfile.user_id == user_id)
+        )
+        return {row.child_id: OwnedChild(row.child_id, row.name, row.birth_date) for row in result}
+
+    async def get_children(self, db: AsyncSession, user_id: int) -> Dict[int, OwnedChild]:
+        entry = self._local.get(user_id) if invalidation_bus.connected else None
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        children: Optional[Dict[int, OwnedChild]] = None
+        if redis_client is not None:
+            try:
+                raw = await redis_client.get(f"{self.prefix}{user_id}")
+                if raw is not None:
+                    children = self._loads(raw)
+            except Exception as e:
+                logger.warning("Child access cache read failed: %s", e)
+
+        if children is None:
+            children = await self._load_from_db(db, user_id)
+            if redis_client is not None:
+                try:
+                    await redis_client.set(f"{self.prefix}{user_id}", self._dumps(children), ex=self.ttl)
+                except Exception as e:
+                    logger.warning("Child access cache write failed: %s", e)
+
+        if invalidation_bus.connected:
+            self._local[user_id] = (time.monotonic() + self.local_ttl, children)
+        return children
+
+    async def require(
+            self,
+            db: AsyncSession,
+            user_id: int,
+            child_id: int,
+            status_code: int = 403,
+            detail: str = "Child profile not found or access denied",
+    ) -> OwnedChild:
+        child = (await self.get_children(db, user_id)).get(child_id)
+        if child is None:
+            raise HTTPException(status_code=status_code, detail=detail)
+        return child
+
+    async def invalidate(self, user_id: int):
+        # Redis first, so no worker refills its local tier from the stale entry
+        if redis_client is not None:
+            try:
+                await redis_client.delete(f"{self.prefix}{user_id}")
+            except Exception as e:
+                logger.warning("Child access cache invalidation failed: %s", e)
+        await invalidation_bus.publish_async("child_access", str(user_id))
+
+
+child_access_cache = ChildAccessCache()
+
+
+async def get_owned_child(
+        child_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user),
+) -> OwnedChild:
+    """Dependency for routes taking `child_id` as a path or query parameter."""
+    return await child_access_cache.require(db, current_user.user_id, child_id)
@@ -64,6 +64,104 @@ class Settings(BaseSettings):
     REDIS_URL: Optional[str] = None
     REDIS_MAX_CONNECTIONS: int = 10
 
+    # Chat write-behind queue
+    CHAT_WRITE_QUEUE_SIZE: int = 1000
+    CHAT_WRITE_BATCH_SIZE: int = 50
+    CHAT_WRITE_FLUSH_INTERVAL: float = 0.5
+    CHAT_WRITE_ENQUEUE_TIMEOUT: float = 2.0
+    CHAT_WRITE_DRAIN_TIMEOUT: float = 10.0
+
+    # Pub/sub channel keeping per-worker cache tiers in sync
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+
+    # Authenticated user cache
+    USER_CACHE_LOCAL_TTL: float = 5.0
+    USER_CACHE_TTL: int = 60
+
+    # Child ownership cache
+    CHILD_ACCESS_LOCAL_TTL: float = 5.0
+    CHILD_ACCESS_TTL: int = 300
+
+    # AI response cache
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL: int = 86400
+    AI_CACHE_LOCAL_SIZE: int = 1024
+    AI_CACHE_MAX_ENTRY_BYTES: int = 16384
+
+    # AI backend HTTP clients (pooled, one per backend)
+    AI_CUSTOM_TIMEOUT: float = 10.0
+    AI_CUSTOM_MAX_CONNECTIONS: int = 50
+    AI_CUSTOM_MAX_KEEPALIVE: int = 20
+    AI_CUSTOM_KEEPALIVE_EXPIRY: float = 30.0
+    AI_CUSTOM_HTTP2: bool = False
+    GROQ_TIMEOUT: float = 15.0
+    GROQ_MAX_CONNECTIONS: int = 20
+    GROQ_MAX_KEEPALIVE: int = 10
+    GROQ_KEEPALIVE_EXPIRY: float = 60.0
+    GROQ_HTTP2: bool = True
+
+    # AI backend concurrency caps
+    AI_CUSTOM_MAX_CONCURRENCY: int = 32
+    AI_CUSTOM_MAX_QUEUE: int = 64
+    AI_CUSTOM_MAX_WAIT: float = 2.0
+    GROQ_MAX_CONCURRENCY: int = 8
+    GROQ_MAX_QUEUE: int = 32
+    GROQ_MAX_WAIT: float = 5.0
+
+    # AI provider circuit breakers and hedging
+    AI_BREAKER_WINDOW: float = 60.0
+    AI_BREAKER_MIN_CALLS: int = 10
+    AI_BREAKER_FAILURE_RATE: float = 0.5
+    AI_BREAKER_OPEN_SECONDS: float = 30.0
+    AI_BREAKER_HALF_OPEN_PROBES: int = 1
+    AI_HEDGE_ENABLED: bool = False
+    AI_HEDGE_MIN_DELAY: float = 0.5
+
+    # AI provider routing
+    AI_ROUTING_COST_WEIGHT: float = 0.0
+    AI_ROUTING_EXPLORE_RATE: float = 0.05
+    AI_CUSTOM_MODELS: str = ""  # Comma-separated
+    AI_CUSTOM_MODEL_SIZE: str = "small"  # "small" or "large"
+    AI_CUSTOM_WEIGHT: float = 1.0
+    AI_CUSTOM_COST_PER_1K: float = 0.0
+    AI_CUSTOM_EXPECTED_LATENCY: float = 1.0
+    GROQ_WEIGHT: float = 1.0
+    GROQ_COST_PER_1K: float = 0.0
+    GROQ_EXPECTED_LATENCY: float = 1.5
+    AI_STUB_PROVIDER: Optional[bool] = None  # Defaults to TESTING
+    AI_STUB_WEIGHT: float = 1.0
+
+    # Conversation context for AI prompts
+    CHAT_CONTEXT_TURNS: int = 10
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 1200
+    CHAT_CONTEXT_TTL: int = 86400
+
+    # Sentiment scoring
+    SENTIMENT_ENGINE: str = "lexicon"  # "lexicon" or "textblob"
+    SENTIMENT_OFFLOAD_CHARS: int = 2000  # Longer texts are scored in a worker thread
+
+    # Rate limiting (token buckets)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT_PER_MINUTE: int = 120
+    RATE_LIMIT_CHAT_PER_MINUTE: int = 20
+    RATE_LIMIT_CHAT_BURST: int = 5
+    RATE_LIMIT_AI_UPSTREAM_PER_MINUTE: int = 600
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.25
+    RATE_LIMIT_REDIS_RETRY_INTERVAL: float = 5.0
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000
+    RATE_LIMIT_LOCAL_PRUNE_INTERVAL: float = 60.0
+
+    # Feedback stream fan-out
+    FEEDBACK_CHANNEL: str = "feedback_events"
+    FEEDBACK_CLIENT_QUEUE_SIZE: int = 100
+    FEEDBACK_SEND_TIMEOUT: float = 5.0
+
+    # Recommendation listing cache (first page per child)
+    RECOMMENDATION_CACHE_TTL: int = 300
+
+    # Feedback export
+    EXPORT_CHUNK_ROWS: int = 1000
+
     # CORS
     ALLOWED_ORIGINS: list = Field(default=["*"], description="CORS allowed origins")
     CORS_ALLOW_CREDENTIALS: bool = True
@@ -0,0 +1,195 @@
+# BackEnd/Utils/conversation_context.py
+
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from cryptography.fernet import InvalidToken
+from pymongo import DESCENDING
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.encryption import decrypt_many, encrypt_data
+from BackEnd.Utils.mongo_client import chat_sessions_collection
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# (role, content) pairs in chronological order, ready for a chat-completions payload
+History = Tuple[Tuple[str, str], ...]
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _first_sentence(text: str, limit: int = 120) -> str:
+    sentence = _SENTENCE_END_RE.split(text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + "..."
+
+
+@dataclass(frozen=True)
+class ContextTurn:
+    user_input: str
+    ai_response: str
+    timestamp: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps({"u": self.user_input, "a": self.ai_response, "t": self.timestamp})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ContextTurn":
+        data = json.loads(raw)
+        return cls(data["u"], data["a"], data.get("t"))
+
+    def seal(self) -> str:
+        """Encrypted form stored in Redis; turns are as sensitive as the chat logs themselves."""
+        return encrypt_data(self.to_json())
+
+
+class ConversationContext:
+    """
+    Recent-conversation window per (user_id, child_id) for AI prompts.
+
+    The last `max_turns` turns live, encrypted, in a Redis list used as a ring buffer;
+    on a miss they are read back from Mongo chat_sessions and the buffer is re-warmed
+    before it is read or appended to, so it never holds a partial window. build()
+    keeps the newest turns verbatim within `token_budget` and folds older ones into
+    a one-line summary, so payloads stay small however long the conversation gets.
+    """
+
+    def __init__(
+            self,
+            max_turns: int = settings.CHAT_CONTEXT_TURNS,
+            token_budget: int = settings.CHAT_CONTEXT_TOKEN_BUDGET,
+            ttl: int = settings.CHAT_CONTEXT_TTL,
+            prefix: str = "chat_ctx:",
+    ):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, user_id: int, child_id: int) -> str:
+        return f"{self.prefix}{user_id}:{child_id}"
+
+    async def append(self, user_id: int, child_id: int, user_input: str, ai_response: str,
+                     timestamp: Optional[datetime] = None):
+        if redis_client is None:
+            return
+        turn = ContextTurn(user_input, ai_response, timestamp.isoformat() if timestamp else None)
+        key = self._key(user_id, child_id)
+        try:
+            warm: List[ContextTurn] = []
+            if not await redis_client.exists(key):
+                # Cold buffer: seed it with the stored window first so the new turn isn't
+                # mistaken for the whole conversation. Skip the new turn if the write-behind
+                # queue already flushed it to MongoDB.
+                warm = [
+                    stored for stored in await self._load_from_mongo(user_id, child_id)
+                    if (stored.user_input, stored.ai_response) != (user_input, ai_response)
+                ]
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if warm:
+                    pipe.delete(key)
+                    pipe.rpush(key, *(stored.seal() for stored in warm))
+                pipe.lpush(key, turn.seal())
+                pipe.ltrim(key, 0, self.max_turns - 1)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Conversation context write failed: %s", e)
+
+    async def recent_turns(self, user_id: int, child_id: int) -> List[ContextTurn]:
+        """Newest-first list of up to max_turns turns."""
+        key = self._key(user_id, child_id)
+        if redis_client is not None:
+            try:
+                raw = await redis_client.lrange(key, 0, self.max_turns - 1)
+                if raw:
+                    return [ContextTurn.from_json(item) for item in decrypt_many(raw)]
+            except InvalidToken:
+                logger.info("Conversation context sealed with a retired key, reloading from MongoDB")
+            except Exception as e:
+                logger.warning("Conversation context read failed, using MongoDB: %s", e)
+
+        turns = await self._load_from_mongo(user_id, child_id)
+        if turns and redis_client is not None:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.delete(key)
+                    pipe.rpush(key, *(turn.seal() for turn in turns))
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("Conversation context warm-up failed: %s", e)
+        return turns
+
+    async def _load_from_mongo(self, user_id: int, child_id: int) -> List[ContextTurn]:
+        try:
+            cursor = chat_sessions_collection.find(
+                {"user_id": user_id, "child_id": child_id},
+                {"_id": 0, "user_input": 1, "ai_response": 1, "timestamp": 1},
+            ).sort("timestamp", DESCENDING).limit(self.max_turns)
+            docs = await cursor.to_list(length=self.max_turns)
+        except Exception as e:
+            logger.warning("Conversation context MongoDB read failed: %s", e)
+            return []
+        return [
+            ContextTurn(
+                doc.get("user_input") or "",
+                doc.get("ai_response") or "",
+                doc["timestamp"].isoformat() if isinstance(doc.get("timestamp"), datetime) else None,
+            )
+            for doc in docs
+        ]
+
+    def fit(self, turns: Sequence[ContextTurn], token_budget: Optional[int] = None) -> History:
+        """
+        Chronological (role, content) messages for newest-first `turns`, within the budget.
+        Up to 80% of the budget goes to the newest turns verbatim; turns that don't fit
+        are summarized by their opening questions in what remains.
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        verbatim_budget = int(budget * 0.8)
+        kept: List[ContextTurn] = []
+        used = 0
+        for index, turn in enumerate(turns):
+            cost = estimate_tokens(turn.user_input) + estimate_tokens(turn.ai_response)
+            if used + cost > verbatim_budget:
+                older = turns[index:]
+                break
+            kept.append(turn)
+            used += cost
+        else:
+            older = []
+
+        messages: List[Tuple[str, str]] = []
+        if older:
+            summary = "Earlier in this conversation the parent asked about: "
+            topics: List[str] = []
+            for turn in older:  # Newest first, so the most recent topics win the budget
+                topic = _first_sentence(turn.user_input)
+                if used + estimate_tokens(summary + "; ".join(topics + [topic])) > budget:
+                    break
+                topics.append(topic)
+            if topics:
+                messages.append(("system", summary + "; ".join(reversed(topics))))
+
+        for turn in reversed(kept):
+            messages.append(("user", turn.user_input))
+            messages.append(("assistant", turn.ai_response))
+        return tuple(messages)
+
+    async def build(self, user_id: int, child_id: int) -> History:
+        return self.fit(await self.recent_turns(user_id, child_id))
+
+
+# Singleton used by the chat routes
+conversation_context = ConversationContext()
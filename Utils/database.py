@@ -1,9 +1,10 @@
 import os
 import logging
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session
 from BackEnd.Utils.config import settings
 from BackEnd.Utils.mongo_client import mongo_client
@@ -11,7 +12,7 @@ import redis
 from alembic.config import Config
 from alembic import command
 from sqlalchemy.orm import declarative_base, sessionmaker
-# from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from contextlib import contextmanager
 from sqlalchemy.orm import Session as SyncSession
 
@@ -54,12 +55,45 @@ def create_db_engine():
     return engine
 
 
+def create_async_db_engine():
+    """
+    Create the asyncpg engine used by async routes.
+    libpq-only query options (sslmode, channel_binding) are translated or dropped
+    since asyncpg does not understand them.
+    """
+    url = make_url(str(settings.DATABASE_URL))
+    query = dict(url.query)
+    connect_args = {
+        "timeout": 5,
+        "server_settings": {"application_name": settings.APP_NAME},
+    }
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode:
+        connect_args["ssl"] = sslmode
+
+    return create_async_engine(
+        url.set(drivername="postgresql+asyncpg", query=query),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_timeout=30,
+        connect_args=connect_args,
+        echo=settings.DATABASE_ECHO
+    )
+
+
 # Create engine and session factory
 engine = create_db_engine()
 SessionFactory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Session = scoped_session(SessionFactory)
 Base.query = Session.query_property()
 
+# Async engine and session factory, used alongside the sync ones
+async_engine = create_async_db_engine()
+AsyncSessionFactory = async_sessionmaker(bind=async_engine, expire_on_commit=False, autoflush=False)
+
 
 # Redis client (sync — only for rate limiting, not session management)
 def get_redis_client():
@@ -78,9 +112,11 @@ def get_redis_client():
 redis_client = get_redis_client()
 
 
-@contextmanager
 def get_db() -> Generator[SyncSession, None, None]:
-    db = Session()
+    """FastAPI dependency yielding a Session; commits on success, rolls back on error."""
+    # A fresh session rather than the thread-local `Session`: FastAPI may run the
+    # dependency's setup, the endpoint and the teardown on different threadpool threads
+    db = SessionFactory()
     try:
         yield db
         db.commit()
@@ -89,7 +125,21 @@ def get_db() -> Generator[SyncSession, None, None]:
         raise
     finally:
         db.close()
-        Session.remove()
+
+
+# Same session lifecycle for code outside FastAPI dependencies: `with db_session() as db:`
+db_session = contextmanager(get_db)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency yielding an AsyncSession; commits on success, rolls back on error."""
+    async with AsyncSessionFactory() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
 
 async def check_database_health():
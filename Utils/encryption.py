@@ -1,31 +1,120 @@
 # BackEnd/Utils/encryption.py
 
+import hashlib
+import json
 import os
-from cryptography.fernet import Fernet, InvalidToken
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 
 _test_key = None  # Holds a test key for use in testing mode
 
+# (keys, cipher) pair; rebuilt only when the configured keys change
+_cipher_cache: Optional[Tuple[Tuple[str, ...], MultiFernet]] = None
 
-def _get_fernet() -> Fernet:
+# Optional shared key ring, e.g. a mounted secret every worker reads: {"keys": [primary, *previous]}.
+# When present it takes precedence over the environment, so a rotation reaches every process.
+KEYRING_FILE = os.getenv("APP_ENCRYPTION_KEYRING_FILE")
+# ((inode, mtime, size), keys) of the last key ring read
+_keyring_cache: Optional[Tuple[Tuple[int, int, int], Tuple[str, ...]]] = None
+
+# Batches at least this large are split across a thread pool
+PARALLEL_BATCH_THRESHOLD = int(os.getenv("ENCRYPTION_PARALLEL_THRESHOLD", 256))
+_PARALLEL_CHUNK_SIZE = 64
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _keyring_keys() -> Optional[Tuple[str, ...]]:
+    """Keys from KEYRING_FILE, re-read only when the file changes; None if there is no key ring."""
+    global _keyring_cache
+    if not KEYRING_FILE:
+        return None
+    try:
+        stat = os.stat(KEYRING_FILE)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _keyring_cache
+    if cached is None or cached[0] != version:
+        with open(KEYRING_FILE) as f:
+            keys = tuple(k for k in json.load(f)["keys"] if k)
+        if not keys:
+            raise RuntimeError(f"Encryption key ring {KEYRING_FILE} has no keys!")
+        cached = (version, keys)
+        _keyring_cache = cached
+    return cached[1]
+
+
+def _current_keys() -> Tuple[str, ...]:
     """
-    Returns a Fernet instance for encryption/decryption.
-    If the environment variable TESTING is set to '1' or 'true',
-    a generated test key is reused to ensure consistent encryption
-    during tests.
+    Returns the configured keys, primary first.
+    In testing mode (TESTING set to '1' or 'true') a generated test key is reused
+    to ensure consistent encryption during tests.
 
-    Otherwise, retrieves the encryption key from APP_ENCRYPTION_KEY
-    environment variable. Raises an error if key is missing.
+    Otherwise the keys come from the shared key ring (APP_ENCRYPTION_KEYRING_FILE) if it
+    exists, else the primary key from APP_ENCRYPTION_KEY and any retired keys still
+    needed for decryption from the comma-separated APP_ENCRYPTION_PREVIOUS_KEYS.
+    Raises an error if the primary key is missing.
     """
     if os.getenv("TESTING", "").lower() in ("1", "true"):
         global _test_key
         if _test_key is None:
-            _test_key = Fernet.generate_key()  # Generate a random test key once
-        return Fernet(_test_key)
+            _test_key = Fernet.generate_key().decode()  # Generate a random test key once
+        return (_test_key,)
+
+    keyring = _keyring_keys()
+    if keyring:
+        return keyring
 
     key = os.getenv("APP_ENCRYPTION_KEY")
     if not key:
         raise RuntimeError("APP_ENCRYPTION_KEY environment variable is not set!")
-    return Fernet(key)
+    previous = [k.strip() for k in os.getenv("APP_ENCRYPTION_PREVIOUS_KEYS", "").split(",") if k.strip()]
+    return (key, *previous)
+
+
+def configured_keys() -> Tuple[str, ...]:
+    """The encryption keys currently in effect, primary first."""
+    return _current_keys()
+
+
+def key_fingerprint(key: str) -> str:
+    """Short, non-reversible identifier for a key, safe to log or store in job state."""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _get_fernet() -> MultiFernet:
+    """
+    Returns the memoized MultiFernet for encryption/decryption.
+    Encrypts with the primary key and decrypts with any configured key,
+    so data written before a key rotation stays readable.
+    """
+    global _cipher_cache
+    keys = _current_keys()
+    cached = _cipher_cache
+    if cached is None or cached[0] != keys:
+        cached = (keys, MultiFernet([Fernet(k) for k in keys]))
+        _cipher_cache = cached
+    return cached[1]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 1),
+                                       thread_name_prefix="fernet")
+    return _executor
+
+
+def _map_batch(func, values: Sequence[str]) -> List[str]:
+    if len(values) < PARALLEL_BATCH_THRESHOLD:
+        return [func(v) for v in values]
+
+    chunks = [values[i:i + _PARALLEL_CHUNK_SIZE] for i in range(0, len(values), _PARALLEL_CHUNK_SIZE)]
+    results: List[str] = []
+    for chunk_result in _get_executor().map(lambda chunk: [func(v) for v in chunk], chunks):
+        results.extend(chunk_result)
+    return results
 
 
 def encrypt_data(data: str) -> str:
@@ -44,6 +133,32 @@ def decrypt_data(token: str) -> str:
     return _get_fernet().decrypt(token.encode()).decode()
 
 
+def encrypt_many(values: Iterable[str]) -> List[str]:
+    """
+    Encrypts a batch of strings, preserving order.
+    Large batches are spread over a thread pool.
+    """
+    cipher = _get_fernet()
+    return _map_batch(lambda v: cipher.encrypt(v.encode()).decode(), list(values))
+
+
+def decrypt_many(tokens: Iterable[str]) -> List[str]:
+    """
+    Decrypts a batch of tokens, preserving order.
+    Raises InvalidToken if any token is invalid or corrupted.
+    """
+    cipher = _get_fernet()
+    return _map_batch(lambda t: cipher.decrypt(t.encode()).decode(), list(tokens))
+
+
+def rotate_token(token: str) -> str:
+    """
+    Re-encrypts a token under the primary key, keeping its original timestamp.
+    Raises InvalidToken if no configured key can decrypt it.
+    """
+    return _get_fernet().rotate(token.encode()).decode()
+
+
 def safe_decrypt(token: str, default: str = "") -> str:
     """
     Attempts to decrypt a token safely.
@@ -0,0 +1,159 @@
+# BackEnd/Utils/feedback_broadcaster.py
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class _Client:
+    """A connected WebSocket with its own bounded send queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+        self.evicted = False
+
+
+class FeedbackBroadcaster:
+    """
+    Fans feedback events out to /feedback-stream sockets on every worker.
+
+    Events are published to a Redis channel; each worker runs one subscriber task
+    that pushes them into per-client queues. A sender task per client drains its
+    queue, so one slow socket never delays the others. Clients whose queue fills
+    up or whose send stalls past `send_timeout` are disconnected.
+    Without Redis, events are delivered to this worker's clients only.
+    """
+
+    def __init__(
+            self,
+            channel: str = settings.FEEDBACK_CHANNEL,
+            client_queue_size: int = settings.FEEDBACK_CLIENT_QUEUE_SIZE,
+            send_timeout: float = settings.FEEDBACK_SEND_TIMEOUT,
+    ):
+        self.channel = channel
+        self.client_queue_size = client_queue_size
+        self.send_timeout = send_timeout
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._subscriber: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.evicted = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if redis_client is not None:
+            self._subscriber = asyncio.create_task(self._subscribe())
+        logger.info("Feedback broadcaster started (channel=%s)", self.channel)
+
+    async def stop(self):
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+        for websocket in list(self._clients):
+            await self.disconnect(websocket)
+        logger.info("Feedback broadcaster stopped")
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        client = _Client(websocket, self.client_queue_size)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self._clients[websocket] = client
+
+    async def disconnect(self, websocket: WebSocket, code: Optional[int] = None):
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.sender is not None and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+        if code is not None:
+            try:
+                await asyncio.wait_for(websocket.close(code=code), timeout=self.send_timeout)
+            except Exception:
+                pass
+
+    async def publish(self, event: Dict[str, Any]):
+        message = json.dumps(event)
+        if redis_client is not None:
+            try:
+                await redis_client.publish(self.channel, message)
+                return
+            except Exception as e:
+                logger.warning("Feedback publish to Redis failed, delivering locally: %s", e)
+        self._fan_out(message)
+
+    def publish_threadsafe(self, event: Dict[str, Any]):
+        """Publish from sync code running in the threadpool; returns without waiting."""
+        if self._loop is None or self._loop.is_closed():
+            logger.debug("Feedback broadcaster not running, dropping event")
+            return
+        asyncio.run_coroutine_threadsafe(self.publish(event), self._loop)
+
+    def stats(self) -> Dict[str, int]:
+        return {"clients": len(self._clients), "evicted": self.evicted}
+
+    def _fan_out(self, message: str):
+        for websocket, client in list(self._clients.items()):
+            try:
+                client.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                if not client.evicted:
+                    logger.warning("Evicting slow feedback stream client (queue full)")
+                    self._evict(client)
+
+    def _evict(self, client: _Client):
+        client.evicted = True
+        self.evicted += 1
+        # 1013: try again later
+        asyncio.create_task(self.disconnect(client.websocket, code=1013))
+
+    async def _send_loop(self, client: _Client):
+        while True:
+            message = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(message), timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Evicting slow feedback stream client (send timed out)")
+                self._evict(client)
+                return
+            except Exception:
+                await self.disconnect(client.websocket)
+                return
+
+    async def _subscribe(self):
+        backoff = 1.0
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._fan_out(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Feedback subscriber lost Redis connection, retrying in %.0fs: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+# Singleton started/stopped by the app lifespan
+feedback_broadcaster = FeedbackBroadcaster()
@@ -0,0 +1,146 @@
+# BackEnd/Utils/feedback_export.py
+
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.database import SessionFactory
+
+EXPORT_HEADER = ["User ID", "Child ID", "Rating", "Feedback", "Timestamp"]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _export_query(start_date: Optional[datetime], end_date: Optional[datetime], child_id: Optional[int]):
+    stmt = (
+        select(ChatLog.user_id, ChatLog.child_id, ChatLog.rating, ChatLog.feedback, ChatLog.timestamp)
+        .where(ChatLog.rating.isnot(None))
+        .order_by(ChatLog.timestamp, ChatLog.id)
+    )
+    if start_date is not None:
+        stmt = stmt.where(ChatLog.timestamp >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(ChatLog.timestamp <= end_date)
+    if child_id is not None:
+        stmt = stmt.where(ChatLog.child_id == child_id)
+    return stmt
+
+
+def iter_feedback_rows(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        child_id: Optional[int] = None,
+        chunk_rows: int = settings.EXPORT_CHUNK_ROWS,
+) -> Iterator[Sequence]:
+    """
+    Yields rated chat logs in lists of at most `chunk_rows`, read through a server-side cursor.
+    Owns its session: it runs inside the response body, after request dependencies exit,
+    and each chunk may be pulled on a different threadpool thread.
+    """
+    stmt = _export_query(start_date, end_date, child_id).execution_options(
+        stream_results=True, yield_per=chunk_rows
+    )
+    with SessionFactory() as db:
+        for partition in db.execute(stmt).partitions():
+            yield partition
+
+
+def iter_csv(rows: Iterator[Sequence]) -> Iterator[bytes]:
+    """Encodes row chunks as CSV, one output chunk per input chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+    for chunk in rows:
+        for user_id, child_id, rating, feedback, timestamp in chunk:
+            writer.writerow([
+                user_id,
+                child_id,
+                rating,
+                feedback or "",
+                timestamp.isoformat() if timestamp else "",
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compresses a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands its buffered bytes back to a generator."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(rows: Iterator[Sequence]) -> Iterator[bytes]:
+    """
+    Encodes row chunks as a Parquet file, one row group per chunk.
+    Requires pyarrow; check parquet_available() before streaming.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("user_id", pa.int64()),
+        ("child_id", pa.int64()),
+        ("rating", pa.int16()),
+        ("feedback", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for chunk in rows:
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.take()
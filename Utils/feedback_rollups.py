@@ -0,0 +1,186 @@
+# BackEnd/Utils/feedback_rollups.py
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Models.feedback_rollup import FeedbackDailyRollup
+from BackEnd.Utils.analytics_queries import daily_feedback_aggregates
+
+logger = logging.getLogger(__name__)
+
+# Keeps concurrently starting workers from seeding the rollups twice
+_BACKFILL_LOCK_KEY = 0x66647272
+
+_SUM_COLUMNS = (
+    "feedback_count",
+    "rating_sum",
+    "improvement_count",
+    "paired_count",
+    "paired_rating_sum",
+    "paired_rating_sq_sum",
+    "paired_sentiment_sum",
+    "paired_sentiment_sq_sum",
+    "paired_product_sum",
+)
+
+
+def _contribution(rating: Optional[int], sentiment: Optional[float]) -> Dict[str, float]:
+    """What one chat log adds to its day's rollup row."""
+    values = dict.fromkeys(_SUM_COLUMNS, 0)
+    if rating is None:
+        return values
+    values["feedback_count"] = 1
+    values["rating_sum"] = rating
+    if sentiment is not None:
+        values["paired_count"] = 1
+        values["paired_rating_sum"] = rating
+        values["paired_rating_sq_sum"] = rating ** 2
+        values["paired_sentiment_sum"] = sentiment
+        values["paired_sentiment_sq_sum"] = sentiment ** 2
+        values["paired_product_sum"] = rating * sentiment
+    return values
+
+
+def _previous_rating(db: Session, chat_log: ChatLog) -> Optional[int]:
+    """Rating of the child's rated chat log immediately before this one."""
+    return db.execute(
+        select(ChatLog.rating)
+        .where(
+            ChatLog.child_id == chat_log.child_id,
+            ChatLog.rating.isnot(None),
+            tuple_(ChatLog.timestamp, ChatLog.id) < (chat_log.timestamp, chat_log.id),
+        )
+        .order_by(ChatLog.timestamp.desc(), ChatLog.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def _next_rated(db: Session, chat_log: ChatLog):
+    """Rating and timestamp of the child's rated chat log immediately after this one, if any."""
+    return db.execute(
+        select(ChatLog.rating, ChatLog.timestamp)
+        .where(
+            ChatLog.child_id == chat_log.child_id,
+            ChatLog.rating.isnot(None),
+            tuple_(ChatLog.timestamp, ChatLog.id) > (chat_log.timestamp, chat_log.id),
+        )
+        .order_by(ChatLog.timestamp, ChatLog.id)
+        .limit(1)
+    ).first()
+
+
+def _is_improvement(rating: Optional[int], before: Optional[int]) -> bool:
+    return rating is not None and before is not None and rating > before
+
+
+def apply_feedback(db: Session, chat_log: ChatLog, previous_rating: Optional[int]):
+    """
+    Fold a rating change on `chat_log` into the rollup rows it affects: its own day's, and
+    the day of the child's next rated log, whose improvement is judged against this rating.
+    `previous_rating` is the log's rating before this submission (None if first rated).
+    Runs in the caller's transaction; commit together with the chat log update.
+    """
+    old = _contribution(previous_rating, chat_log.sentiment_score)
+    new = _contribution(chat_log.rating, chat_log.sentiment_score)
+    delta = {col: new[col] - old[col] for col in _SUM_COLUMNS}
+
+    prior = _previous_rating(db, chat_log)
+    delta["improvement_count"] = (
+        int(_is_improvement(chat_log.rating, prior)) - int(_is_improvement(previous_rating, prior))
+    )
+
+    day = (chat_log.timestamp or datetime.utcnow()).date()
+    deltas = {day: delta}
+
+    successor = _next_rated(db, chat_log)
+    if successor is not None:
+        # The successor compares against this log while it is rated, else against `prior`
+        was_before = previous_rating if previous_rating is not None else prior
+        now_before = chat_log.rating if chat_log.rating is not None else prior
+        change = (
+            int(_is_improvement(successor.rating, now_before))
+            - int(_is_improvement(successor.rating, was_before))
+        )
+        if change:
+            successor_delta = deltas.setdefault(successor.timestamp.date(), dict.fromkeys(_SUM_COLUMNS, 0))
+            successor_delta["improvement_count"] += change
+
+    rows = [
+        {"day": row_day, "child_id": chat_log.child_id, **row_delta}
+        for row_day, row_delta in deltas.items()
+        if any(row_delta.values())
+    ]
+    if not rows:
+        return
+
+    # Both days go in one statement; they are distinct keys, so ON CONFLICT touches each once
+    insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    stmt = insert(FeedbackDailyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FeedbackDailyRollup.day, FeedbackDailyRollup.child_id],
+        set_={
+            **{col: getattr(FeedbackDailyRollup, col) + getattr(stmt.excluded, col) for col in _SUM_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def compact_feedback_rollups(db: Session, since: Optional[date] = None) -> int:
+    """
+    Rebuild rollup rows from chat_logs for every day >= `since` (all days if None).
+    Corrects drift from out-of-order ratings; returns the number of rows written.
+    """
+    aggregates = daily_feedback_aggregates(since)
+
+    clear = delete(FeedbackDailyRollup)
+    if since is not None:
+        clear = clear.where(FeedbackDailyRollup.day >= since)
+
+    db.execute(clear)
+    result = db.execute(
+        FeedbackDailyRollup.__table__.insert().from_select(
+            ["day", "child_id", *_SUM_COLUMNS], aggregates
+        )
+    )
+    db.commit()
+    logger.info("Compacted feedback rollups since %s: %s rows", since or "beginning", result.rowcount)
+    return result.rowcount
+
+
+def backfill_feedback_rollups(bind: Engine) -> int:
+    """
+    Seed the rollups from all of chat_logs when the table is empty, e.g. after create_all
+    made it on a deployment that already had ratings. Returns the number of rows written.
+    """
+    with Session(bind) as db:
+        if bind.dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _BACKFILL_LOCK_KEY})
+        if db.execute(select(FeedbackDailyRollup.day).limit(1)).first() is not None:
+            return 0
+        if db.execute(select(ChatLog.id).where(ChatLog.rating.isnot(None)).limit(1)).first() is None:
+            return 0
+        return compact_feedback_rollups(db, since=None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from BackEnd.Utils.database import db_session
+
+    parser = argparse.ArgumentParser(description="Rebuild feedback rollups from chat_logs")
+    parser.add_argument("--full", action="store_true", help="Rebuild every day instead of the last week")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with db_session() as session:
+        # Periodic run: re-derive the recent window, where late ratings land
+        since = None if args.full else date.today() - timedelta(days=7)
+        compact_feedback_rollups(session, since=since)
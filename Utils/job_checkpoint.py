@@ -0,0 +1,56 @@
+# BackEnd/Utils/job_checkpoint.py
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+from BackEnd.Utils.database import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = Path(os.getenv("JOB_CHECKPOINT_DIR", ".job_checkpoints"))
+
+
+class JobCheckpoint:
+    """
+    Persisted progress for long-running batch jobs so they can resume after a restart.
+    Stored in Redis when available, otherwise in a JSON file under JOB_CHECKPOINT_DIR.
+    """
+
+    def __init__(self, name: str, prefix: str = "job_checkpoint:"):
+        self.name = name
+        self.key = prefix + name
+        self.path = CHECKPOINT_DIR / f"{name}.json"
+
+    def load(self) -> Dict[str, Any]:
+        if redis_client is not None:
+            try:
+                raw = redis_client.get(self.key)
+                return json.loads(raw) if raw else {}
+            except Exception as e:
+                logger.warning("Checkpoint %s read from Redis failed, using file: %s", self.name, e)
+        if self.path.exists():
+            return json.loads(self.path.read_text())
+        return {}
+
+    def save(self, state: Dict[str, Any]):
+        raw = json.dumps(state, default=str)
+        if redis_client is not None:
+            try:
+                redis_client.set(self.key, raw)
+                return
+            except Exception as e:
+                logger.warning("Checkpoint %s write to Redis failed, using file: %s", self.name, e)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(raw)
+
+    def clear(self):
+        if redis_client is not None:
+            try:
+                redis_client.delete(self.key)
+            except Exception as e:
+                logger.warning("Checkpoint %s clear in Redis failed: %s", self.name, e)
+        if self.path.exists():
+            self.path.unlink()
@@ -5,7 +5,7 @@ import logging
 from datetime import datetime
 from typing import Dict
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING
+from pymongo import ASCENDING, DESCENDING
 from BackEnd.Utils.config import settings
 
 # Setup asynchronous MongoDB client with TLS/SSL
@@ -31,6 +31,11 @@ async def ensure_indexes():
             [("user_id", ASCENDING), ("child_id", ASCENDING)],
             name="user_child_composite"
         )
+        # Conversation context fallback: newest turns per (user, child)
+        await chat_sessions_collection.create_index(
+            [("user_id", ASCENDING), ("child_id", ASCENDING), ("timestamp", DESCENDING)],
+            name="user_child_recent"
+        )
         logging.info("MongoDB indexes ensured successfully.")
     except Exception as e:
         logging.warning(f"Could not create MongoDB indexes: {e}")
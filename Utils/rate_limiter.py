@@ -1,53 +1,292 @@
 # BackEnd/Utils/rate_limiter.py
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 import redis.asyncio as redis
-from fastapi import HTTPException, status, Depends
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import HTTPException, Request, Response, status
+from jose import JWTError
 
-from BackEnd.Utils.config import settings  # Replace with your actual config import path
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.security import decode_token
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+logger = logging.getLogger(__name__)
 
 redis_client = None
+_bucket_script = None
+
+# Atomic multi-bucket take: refill every bucket from elapsed time, then take `cost`
+# tokens from all of them or, if any is short, from none. Uses the Redis clock so
+# every worker sees the same time.
+# KEYS: bucket keys. ARGV: cost, then capacity and refill rate for each key.
+# Returns {allowed, retry_after_seconds, tokens_left for each key}.
+TOKEN_BUCKET_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local cost = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local tokens = {}
+local allowed = 1
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i])
+  local rate = tonumber(ARGV[2 * i + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local level = tonumber(state[1])
+  local ts = tonumber(state[2])
+  if level == nil or ts == nil then
+    level = capacity
+    ts = now
+  end
+  level = math.min(capacity, level + math.max(0, now - ts) * rate)
+  if level < cost then
+    allowed = 0
+    retry_after = math.max(retry_after, (cost - level) / rate)
+  end
+  tokens[i] = level
+end
+
+local result = {allowed, tostring(retry_after)}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i])
+  local rate = tonumber(ARGV[2 * i + 1])
+  if allowed == 1 then
+    tokens[i] = tokens[i] - cost
+  end
+  redis.call('HSET', key, 'tokens', tokens[i], 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+  result[i + 2] = tostring(tokens[i])
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket holding up to `capacity` requests, refilled at `refill_per_second`."""
+    name: str
+    capacity: int
+    refill_per_second: float
+    scope: str = "user"  # "user": one bucket per caller; "global": one bucket shared by everyone
+
+    @classmethod
+    def per_minute(cls, name: str, requests: int, burst: Optional[int] = None, scope: str = "user"):
+        return cls(name, burst or requests, requests / 60.0, scope)
+
+
+# (Redis key, policy) for one bucket a request is charged against
+Bucket = Tuple[str, RateLimitPolicy]
+
+RATE_LIMIT_POLICIES: Dict[str, RateLimitPolicy] = {
+    "default": RateLimitPolicy.per_minute("default", settings.RATE_LIMIT_DEFAULT_PER_MINUTE),
+    "chat": RateLimitPolicy.per_minute(
+        "chat", settings.RATE_LIMIT_CHAT_PER_MINUTE, burst=settings.RATE_LIMIT_CHAT_BURST
+    ),
+    # Shared across all users: keeps the app under the upstream Groq quota
+    "ai_upstream": RateLimitPolicy.per_minute(
+        "ai_upstream", settings.RATE_LIMIT_AI_UPSTREAM_PER_MINUTE, scope="global"
+    ),
+}
+
+
+class _LocalBuckets:
+    """
+    In-process token buckets, one per (policy, caller) on this worker.
+
+    While Redis is up they mirror the last state Redis reported for each key and act
+    as a pre-limiter: other workers can only have drained a bucket further, so a key
+    whose mirrored bucket is empty is rejected without a Redis round trip. Every
+    request that passes goes to Redis, which stays the authority and re-syncs the
+    mirror. While Redis is down they are the limiter (limits then apply per worker).
+    """
+
+    def __init__(
+            self,
+            max_keys: int = settings.RATE_LIMIT_LOCAL_MAX_KEYS,
+            prune_interval: float = settings.RATE_LIMIT_LOCAL_PRUNE_INTERVAL,
+    ):
+        self.max_keys = max_keys
+        self.prune_interval = prune_interval
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._next_prune = time.monotonic() + prune_interval
+        self.shed = 0
+
+    @staticmethod
+    def _refill(state: Tuple[float, float], policy: RateLimitPolicy, now: float) -> float:
+        tokens, ts = state
+        return min(policy.capacity, tokens + (now - ts) * policy.refill_per_second)
+
+    def take(self, buckets: Sequence[Bucket], cost: int = 1) -> Tuple[bool, List[float], float]:
+        """Takes `cost` from every bucket, or from none if any of them is short."""
+        now = time.monotonic()
+        levels = [
+            self._refill(self._buckets.pop(key, (policy.capacity, now)), policy, now)
+            for key, policy in buckets
+        ]
+        retry_after = max(
+            ((cost - tokens) / policy.refill_per_second
+             for (_, policy), tokens in zip(buckets, levels) if tokens < cost),
+            default=0.0,
+        )
+        allowed = all(tokens >= cost for tokens in levels)
+        if allowed:
+            levels = [tokens - cost for tokens in levels]
+
+        for (key, _), tokens in zip(buckets, levels):
+            self._store(key, tokens, now)
+        return allowed, levels, retry_after
+
+    def precheck(self, buckets: Sequence[Bucket], cost: int = 1) -> Optional[float]:
+        """Returns the retry-after for a request that is certain to be rejected, else None."""
+        now = time.monotonic()
+        retry_after = None
+        for key, policy in buckets:
+            state = self._buckets.get(key)
+            if state is None:
+                continue
+            tokens = self._refill(state, policy, now)
+            if tokens < cost:
+                retry_after = max(retry_after or 0.0, (cost - tokens) / policy.refill_per_second)
+        if retry_after is not None:
+            self.shed += 1
+        return retry_after
+
+    def sync(self, key: str, tokens: float):
+        """Records the bucket state Redis just reported for `key`."""
+        self._store(key, tokens, time.monotonic())
+
+    def prune(self, now: float):
+        """Drops keys whose bucket has refilled completely; they carry no information."""
+        self._next_prune = now + self.prune_interval
+        for key, (tokens, ts) in list(self._buckets.items()):
+            policy = RATE_LIMIT_POLICIES.get(key.split(":", 2)[1])
+            if policy is None or self._refill((tokens, ts), policy, now) >= policy.capacity:
+                del self._buckets[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._buckets), "shed": self.shed}
+
+    def _store(self, key: str, tokens: float, now: float):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if now >= self._next_prune:
+            self.prune(now)
+
+
+_local_buckets = _LocalBuckets()
+_redis_retry_at = 0.0  # monotonic time before which Redis is skipped after a failure
 
 
 async def init_rate_limiter():
-    global redis_client
+    global redis_client, _bucket_script
     try:
-        # Initialize Redis client without ssl=True
-        redis_client = redis.from_url(settings.REDIS_URL)
+        redis_client = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+        )
         await redis_client.ping()
-        print("Redis rate limiter connected successfully.")
+        _bucket_script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        logger.info("Redis rate limiter connected successfully.")
     except Exception as e:
-        print(f"Redis connection failed: {e}")
+        logger.warning(f"Redis rate limiter unavailable, using in-process limits: {e}")
         redis_client = None
+        _bucket_script = None
+
+
+async def _take(buckets: Sequence[Bucket], cost: int = 1) -> Tuple[bool, List[float], float]:
+    """Charges every bucket for one request, all or nothing; returns (allowed, tokens_left, retry_after)."""
+    global _redis_retry_at
+    if _bucket_script is not None and time.monotonic() >= _redis_retry_at:
+        retry_after = _local_buckets.precheck(buckets, cost)
+        if retry_after is not None:
+            return False, [0.0] * len(buckets), retry_after
+        args = [cost]
+        for _, policy in buckets:
+            args += [policy.capacity, policy.refill_per_second]
+        try:
+            allowed, retry_after, *tokens = await _bucket_script(
+                keys=[key for key, _ in buckets], args=args
+            )
+            levels = [float(level) for level in tokens]
+            for (key, _), level in zip(buckets, levels):
+                _local_buckets.sync(key, level)
+            return bool(int(allowed)), levels, float(retry_after)
+        except Exception as e:
+            # Don't pay a Redis timeout on every request while it is down
+            _redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_INTERVAL
+            logger.warning(f"Rate limiter Redis call failed, using in-process limits: {e}")
+    return _local_buckets.take(buckets, cost)
 
 
-async def api_rate_limit(token: str = Depends(oauth2_scheme)):
-    if redis_client is None:
-        # Redis is unavailable; fallback - no rate limiting
+def _caller_identity(request: Request) -> str:
+    """Decoded JWT subject for authenticated callers, otherwise the client address."""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_token(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def check_rate_limit(request: Request, response: Optional[Response], *policy_names: str):
+    """
+    Applies the named policies to the caller; raises 429 with Retry-After when any bucket is empty.
+    Either every bucket is charged or, on rejection, none is.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
         return
 
-    user_id = token  # Adjust if you extract user_id differently
+    identity = None
+    buckets: List[Bucket] = []
+    for name in policy_names:
+        policy = RATE_LIMIT_POLICIES[name]
+        if policy.scope == "global":
+            key = f"rate_limit:{policy.name}"
+        else:
+            identity = identity or _caller_identity(request)
+            key = f"rate_limit:{policy.name}:{identity}"
+        buckets.append((key, policy))
+
+    allowed, levels, retry_after = await _take(buckets)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, slow down!",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+    if response is not None:
+        for (_, policy), tokens in zip(buckets, levels):
+            if policy.scope != "global":
+                response.headers["X-RateLimit-Limit"] = str(policy.capacity)
+                response.headers["X-RateLimit-Remaining"] = str(int(tokens))
 
-    key = f"rate_limit:{user_id}"
-    try:
-        current = await redis_client.get(key)
-        if current and int(current) >= 5:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many requests, slow down!"
-            )
-        pipe = redis_client.pipeline()
-        pipe.incr(key, amount=1)
-        pipe.expire(key, 10)
-        await pipe.execute()
-    except Exception:
-        # Fail silently on Redis errors
-        pass
 
+def rate_limiter_stats() -> Dict[str, Any]:
+    return {"redis": _bucket_script is not None, "local": _local_buckets.stats()}
 
-def rate_limit_dep(name: str):
-    async def dependency():
-        return await api_rate_limit(name)
+
+def rate_limit_dep(*policy_names: str):
+    """Dependency applying the named policies, e.g. Depends(rate_limit_dep("chat", "ai_upstream"))."""
+    names = policy_names or ("default",)
+    unknown = [name for name in names if name not in RATE_LIMIT_POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown rate limit policies: {unknown}")
+
+    async def dependency(request: Request, response: Response):
+        await check_rate_limit(request, response, *names)
 
     return dependency
+
+
+api_rate_limit = rate_limit_dep("default")
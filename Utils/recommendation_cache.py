@@ -0,0 +1,83 @@
+# BackEnd/Utils/recommendation_cache.py
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header value covers `etag`."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+
+
+class RecommendationPageCache:
+    """
+    Serialized first page of each child's recommendation listing, in Redis.
+    All variants (limit and filters) for a child share one hash so a single DEL
+    invalidates them; every recommendation write for the child must call invalidate().
+    """
+
+    def __init__(self, ttl: int = settings.RECOMMENDATION_CACHE_TTL, prefix: str = "rec_page:"):
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, child_id: int) -> str:
+        return f"{self.prefix}{child_id}"
+
+    async def get(self, child_id: int, variant: str) -> Optional[CachedPage]:
+        if redis_client is None:
+            return None
+        try:
+            raw = await redis_client.hget(self._key(child_id), variant)
+        except Exception as e:
+            logger.warning("Recommendation cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CachedPage(data["body"].encode(), data["etag"], data.get("next"))
+
+    async def set(self, child_id: int, variant: str, page: CachedPage):
+        if redis_client is None:
+            return
+        raw = json.dumps({"body": page.body.decode(), "etag": page.etag, "next": page.next_cursor})
+        key = self._key(child_id)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, variant, raw)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Recommendation cache write failed: %s", e)
+
+    async def invalidate(self, *child_ids: int):
+        if redis_client is None or not child_ids:
+            return
+        try:
+            await redis_client.delete(*(self._key(child_id) for child_id in child_ids))
+        except Exception as e:
+            logger.warning("Recommendation cache invalidation failed: %s", e)
+
+
+recommendation_cache = RecommendationPageCache()
@@ -0,0 +1,157 @@
+# BackEnd/Utils/recommendation_writer.py
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import and_, cast, column, exists, inspect, literal, or_, select, text, union_all, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from BackEnd.Models.recommendation import (
+    GENERATED_ONLY, Recommendation, RecommendationPriority, RecommendationSource
+)
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "child_id", "title", "description", "source", "priority",
+    "effective_date", "expiration_date", "type", "extra_data", "created_at",
+)
+# Partial unique index over generated rows backing ON CONFLICT DO NOTHING (see migration d4a7b2c9f1e3)
+_CONFLICT_COLUMNS = ("child_id", "title", "type", "effective_date")
+# Serializes index builds when several workers start at once
+_INDEX_LOCK_KEY = 0x7265636F
+
+
+def _row(child_id: int, rec: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Recommendation column values for a generator/AI dict; its "metadata" goes to extra_data."""
+    return {
+        "child_id": child_id,
+        "title": rec["title"],
+        "description": rec["description"],
+        "source": RecommendationSource(rec.get("source") or RecommendationSource.AI_MODEL),
+        "priority": RecommendationPriority(rec.get("priority") or RecommendationPriority.MEDIUM),
+        "effective_date": rec.get("effective_date") or now.date(),
+        "expiration_date": rec.get("expiration_date"),
+        "type": rec.get("type"),
+        "extra_data": rec.get("extra_data", rec.get("metadata")),
+        "created_at": now,
+    }
+
+
+def _dedupe_key(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(row[col] for col in _CONFLICT_COLUMNS)
+
+
+def recommendation_rows(items: Iterable[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Column values for (child_id, recommendation) pairs, first occurrence of each duplicate kept."""
+    now = datetime.utcnow()
+    rows: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for child_id, rec in items:
+        row = _row(child_id, rec, now)
+        rows.setdefault(_dedupe_key(row), row)
+    return list(rows.values())
+
+
+def _source(rows: List[Dict[str, Any]], dialect_name: str):
+    table = Recommendation.__table__
+    if dialect_name == "sqlite":
+        # SQLite can't name the columns of a VALUES alias
+        return union_all(*(
+            select(*(literal(row[col], table.c[col].type).label(col) for col in _COLUMNS))
+            for row in rows
+        )).subquery("new_recommendations")
+    return values(
+        *(column(col, table.c[col].type) for col in _COLUMNS), name="new_recommendations"
+    ).data([tuple(row[col] for col in _COLUMNS) for row in rows])
+
+
+def build_insert(rows: List[Dict[str, Any]], dialect_name: str = "postgresql"):
+    """
+    One INSERT ... SELECT over a VALUES list that skips rows matching a recommendation
+    already active for the child (same title and type, effective on the new row's date),
+    with ON CONFLICT DO NOTHING covering concurrent writers.
+    """
+    table = Recommendation.__table__
+    new = _source(rows, dialect_name)
+
+    existing = aliased(Recommendation)
+    active_duplicate = exists().where(
+        existing.child_id == new.c.child_id,
+        existing.title == new.c.title,
+        existing.type.is_not_distinct_from(new.c.type),
+        or_(
+            existing.effective_date == new.c.effective_date,
+            and_(
+                existing.effective_date <= new.c.effective_date,
+                or_(existing.expiration_date.is_(None), existing.expiration_date >= new.c.effective_date),
+            ),
+        ),
+    )
+    if dialect_name == "sqlite":
+        # The SELECT literals are already typed, and SQLite's CAST would turn dates into numbers
+        columns = [new.c[col] for col in _COLUMNS]
+    else:
+        # VALUES entries arrive untyped; cast each to its target column type (enums included)
+        columns = [cast(new.c[col], table.c[col].type) for col in _COLUMNS]
+    rows_to_insert = select(*columns).where(~active_duplicate)
+
+    insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+    return (
+        insert(table)
+        .from_select(list(_COLUMNS), rows_to_insert)
+        .on_conflict_do_nothing(index_elements=list(_CONFLICT_COLUMNS), index_where=GENERATED_ONLY)
+    )
+
+
+def write_recommendations(db: Session, child_id: int, recs: List[Dict[str, Any]]) -> int:
+    """Inserts new recommendations for a child in one round trip; runs in the caller's transaction."""
+    rows = recommendation_rows((child_id, rec) for rec in recs)
+    if not rows:
+        return 0
+    result = db.execute(build_insert(rows, db.get_bind().dialect.name))
+    return result.rowcount
+
+
+async def write_recommendations_async(db: AsyncSession, child_id: int, recs: List[Dict[str, Any]]) -> int:
+    """Async variant of write_recommendations for request handlers."""
+    rows = recommendation_rows((child_id, rec) for rec in recs)
+    if not rows:
+        return 0
+    result = await db.execute(build_insert(rows, db.get_bind().dialect.name))
+    return result.rowcount
+
+
+def ensure_recommendation_indexes(bind: Engine):
+    """
+    Builds the recommendation indexes missing from an existing table; create_all only
+    adds them to tables it creates. Duplicate generated rows are removed (oldest kept)
+    before the unique index is built.
+    """
+    table = Recommendation.__table__
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _INDEX_LOCK_KEY})
+        existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                deleted = conn.execute(text(
+                    """
+                    DELETE FROM recommendations
+                    WHERE source = 'AI_MODEL'
+                      AND id NOT IN (
+                        SELECT MIN(id) FROM recommendations
+                        WHERE source = 'AI_MODEL'
+                        GROUP BY child_id, title, type, effective_date
+                      )
+                    """
+                )).rowcount
+                if deleted:
+                    logger.info("Removed %s duplicate generated recommendations", deleted)
+            index.create(conn)
+            logger.info("Created index %s", index.name)
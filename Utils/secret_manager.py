@@ -1,18 +1,226 @@
 # BackEnd/Utils/secret_manager.py
 
 import os
-from cryptography.fernet import Fernet
+import json
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import Table, bindparam, select, update
+
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Models.child_profile import ChildProfile
+from BackEnd.Utils.database import engine
+from BackEnd.Utils.encryption import (
+    KEYRING_FILE, configured_keys, decrypt_data, encrypt_data, key_fingerprint, rotate_token
+)
+from BackEnd.Utils.job_checkpoint import JobCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+def _write_keyring(keys: Sequence[str]):
+    """Atomically replaces the shared key ring; every worker picks it up on its next encrypt/decrypt."""
+    if not KEYRING_FILE:
+        raise RuntimeError(
+            "APP_ENCRYPTION_KEYRING_FILE is not set; key changes made through environment "
+            "variables would only reach this process"
+        )
+    path = Path(KEYRING_FILE)
+    tmp = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"keys": list(keys)}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 
 class SecretManager:
     @staticmethod
     def rotate_keys():
-        """Run monthly via cron job"""
+        """
+        Run monthly via cron job.
+        Writes a new primary key to the shared key ring; the old keys stay in it so existing
+        rows stay readable. Run ReencryptionJob afterwards, then retire_previous_keys().
+        """
+        keys = configured_keys()
         new_key = Fernet.generate_key()
-        old_key = os.getenv("APP_ENCRYPTION_KEY")
+        _write_keyring((new_key.decode(), *keys))
+
+        # Progress recorded under the old key says nothing about the new one
+        JobCheckpoint(REENCRYPTION_CHECKPOINT).clear()
+        logger.info("Rotated encryption key to %s", key_fingerprint(new_key.decode()))
+
+        return new_key, keys[0]
+
+    @staticmethod
+    def retire_previous_keys():
+        """
+        Drop retired keys once every row has been re-encrypted under the primary key.
+        Refuses while ReencryptionJob hasn't completed for the current primary key.
+        """
+        keys = configured_keys()
+        if not ReencryptionJob().is_complete():
+            raise RuntimeError(
+                f"Re-encryption under key {key_fingerprint(keys[0])} has not completed; "
+                "run ReencryptionJob before retiring previous keys"
+            )
+        _write_keyring(keys[:1])
+
+
+@dataclass(frozen=True)
+class ReencryptionTarget:
+    table: Table
+    pk: str
+    columns: Tuple[str, ...]
+    layers: int = 1  # Number of nested encryption layers in each value
+
+
+REENCRYPTION_CHECKPOINT = "reencryption"
+
+REENCRYPTION_TARGETS = (
+    # ChatLog text is encrypted by the caller and again by the model setter
+    ReencryptionTarget(ChatLog.__table__, "id", ("user_input", "chatbot_response"), layers=2),
+    ReencryptionTarget(ChildProfile.__table__, "child_id", ("behavioral_patterns", "emotional_state")),
+)
+
+
+def _rotate_value(value: str, layers: int) -> str:
+    if layers == 1:
+        return rotate_token(value)
+    inner = decrypt_data(value)
+    try:
+        inner = _rotate_value(inner, layers - 1)
+    except InvalidToken:
+        pass  # Row was written with fewer layers (e.g. ChatLog.create_log)
+    return encrypt_data(inner)
+
+
+class ReencryptionJob:
+    """
+    Resumable, batched re-encryption of every encrypted column under the current primary key.
+
+    Walks each table by primary-key ranges, one short transaction per batch, so no
+    table-wide lock is taken. Updates are guarded on the old ciphertext: rows changed
+    concurrently by the app (already written with the new key) are left alone.
+    Progress is checkpointed after every batch and the job resumes from the last id;
+    the checkpoint records which primary key it was made for, so a rotation starts over.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = 500,
+            max_rows_per_second: Optional[float] = 2000.0,
+            checkpoint: Optional[JobCheckpoint] = None,
+    ):
+        self.batch_size = batch_size
+        self.max_rows_per_second = max_rows_per_second
+        self.checkpoint = checkpoint or JobCheckpoint(REENCRYPTION_CHECKPOINT)
+        self.state: Dict[str, Any] = {}
+
+    def run(self, targets=REENCRYPTION_TARGETS) -> Dict[str, Any]:
+        key = key_fingerprint(configured_keys()[0])
+        self.state = self.checkpoint.load()
+        if self.state.get("key") != key:
+            self.state = {"key": key}
+        for target in targets:
+            self._run_target(target)
+        logger.info("Re-encryption finished: %s", self.state)
+        return self.state
+
+    def progress(self) -> Dict[str, Any]:
+        return self.state or self.checkpoint.load()
+
+    def reset(self):
+        self.checkpoint.clear()
+        self.state = {}
+
+    def is_complete(self, targets=REENCRYPTION_TARGETS) -> bool:
+        """True once every target has been fully re-encrypted under the current primary key."""
+        state = self.checkpoint.load()
+        return state.get("key") == key_fingerprint(configured_keys()[0]) and all(
+            state.get(target.table.name, {}).get("done") for target in targets
+        )
+
+    def _update_statement(self, target: ReencryptionTarget):
+        table = target.table
+        stmt = update(table).where(table.c[target.pk] == bindparam("_pk"))
+        for col in target.columns:
+            stmt = stmt.where(table.c[col].is_not_distinct_from(bindparam(f"old_{col}")))
+        return stmt.values({col: bindparam(f"new_{col}") for col in target.columns})
+
+    def _run_target(self, target: ReencryptionTarget):
+        table = target.table
+        name = table.name
+        progress = self.state.setdefault(name, {
+            "last_id": 0, "rows_processed": 0, "rows_updated": 0, "rows_failed": 0, "done": False,
+        })
+        if progress["done"]:
+            logger.info("Re-encryption of %s already complete, skipping", name)
+            return
+
+        pk_col = table.c[target.pk]
+        select_stmt = (
+            select(pk_col, *(table.c[col] for col in target.columns))
+            .where(pk_col > bindparam("last_id"))
+            .order_by(pk_col)
+            .limit(self.batch_size)
+        )
+        update_stmt = self._update_statement(target)
+        started = time.monotonic()
+        processed_this_run = 0
+
+        while True:
+            batch_started = time.monotonic()
+            with engine.begin() as conn:
+                rows = conn.execute(select_stmt, {"last_id": progress["last_id"]}).all()
+                if not rows:
+                    break
+
+                params = []
+                for row in rows:
+                    values = dict(zip(target.columns, row[1:]))
+                    try:
+                        rotated = {
+                            col: _rotate_value(value, target.layers) if value else value
+                            for col, value in values.items()
+                        }
+                    except InvalidToken:
+                        progress["rows_failed"] += 1
+                        logger.error("Re-encryption: %s %s=%s is not decryptable", name, target.pk, row[0])
+                        continue
+                    param = {"_pk": row[0]}
+                    param.update({f"old_{col}": value for col, value in values.items()})
+                    param.update({f"new_{col}": value for col, value in rotated.items()})
+                    params.append(param)
+
+                if params:
+                    result = conn.execute(update_stmt, params)
+                    progress["rows_updated"] += result.rowcount
+
+            progress["last_id"] = rows[-1][0]
+            progress["rows_processed"] += len(rows)
+            processed_this_run += len(rows)
+            elapsed = time.monotonic() - started
+            progress["rows_per_second"] = round(processed_this_run / elapsed, 1) if elapsed else None
+            self.checkpoint.save(self.state)
+            logger.info("Re-encryption %s: last_id=%s processed=%s failed=%s (%.1f rows/s)",
+                        name, progress["last_id"], progress["rows_processed"],
+                        progress["rows_failed"], progress["rows_per_second"] or 0.0)
+
+            if self.max_rows_per_second:
+                min_duration = len(rows) / self.max_rows_per_second
+                remaining = min_duration - (time.monotonic() - batch_started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+        progress["done"] = True
+        self.checkpoint.save(self.state)
 
-        # Add re-encryption logic for existing data
-        # Store new key in environment
-        os.environ["APP_ENCRYPTION_KEY"] = new_key.decode()
 
-        return new_key, old_key
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ReencryptionJob().run()
@@ -0,0 +1,232 @@
+# BackEnd/Utils/sentiment.py
+
+import asyncio
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from BackEnd.Models.chat_log import SentimentMixin
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.sentiment_lexicon import AR_LEXICON, EN_LEXICON, INTENSIFIERS, NEGATIONS
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_THRESHOLD = SentimentMixin.SENTIMENT_THRESHOLDS["positive"]
+NEGATIVE_THRESHOLD = SentimentMixin.SENTIMENT_THRESHOLDS["negative"]
+
+
+class SentimentResult(NamedTuple):
+    polarity: float
+    label: str
+
+
+def sentiment_label(polarity: float) -> str:
+    """Same boundaries as SentimentMixin.get_sentiment_label."""
+    if polarity >= POSITIVE_THRESHOLD:
+        return "positive"
+    if polarity <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+class SentimentEngine(ABC):
+    """Scores text polarity in [-1.0, 1.0]. Subclasses implement score()."""
+
+    name = "base"
+
+    @abstractmethod
+    def score(self, text: str) -> float:
+        ...
+
+    def score_many(self, texts: Sequence[str]) -> List[float]:
+        return [self.score(text) for text in texts]
+
+    def analyze(self, text: str) -> SentimentResult:
+        polarity = self.score(text)
+        return SentimentResult(polarity, sentiment_label(polarity))
+
+
+# Arabic: drop diacritics and tatweel, fold alef/yaa/taa marbuta variants
+_ARABIC_FOLD = {code: None for code in (*range(0x064B, 0x0653), 0x0670, 0x0640)}
+_ARABIC_FOLD.update({ord("أ"): "ا", ord("إ"): "ا", ord("آ"): "ا", ord("ى"): "ي", ord("ة"): "ه"})
+_ARABIC_PREFIXES = ("وال", "بال", "فال", "كال", "لل", "ال", "و", "ف", "ب", "ل")
+# Inflectional endings, after folding: feminine plural, masculine plural/dual, tanween
+# alif ("جيداً" -> "جيدا"), taa marbuta ("سعيدة" -> "سعيده")
+_ARABIC_SUFFIXES = ("ات", "ين", "ون", "ا", "ه")
+# Conjunctions that attach to a negation ("ولا", "فليس")
+_ARABIC_CONJUNCTIONS = ("و", "ف")
+
+# Letters-only words; English "n't" is split off so it can act as a negation
+_WORD_RE = re.compile(r"[^\W\d_]+(?=n't)|n't|[^\W\d_]+|!")
+
+
+def _normalize_arabic(text: str) -> str:
+    return text.translate(_ARABIC_FOLD)
+
+
+def _is_arabic(token: str) -> bool:
+    return "\u0600" <= token[0] <= "\u06ff"
+
+
+def _arabic_stems(token: str) -> List[str]:
+    """The token with each matching clitic prefix removed, longest prefix first."""
+    return [
+        token[len(prefix):] for prefix in _ARABIC_PREFIXES
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2
+    ]
+
+
+def _arabic_unsuffixed(stem: str) -> List[str]:
+    """Lookup forms of a stem with an inflectional ending removed."""
+    forms = []
+    for suffix in _ARABIC_SUFFIXES:
+        if stem.endswith(suffix) and len(stem) - len(suffix) >= 2:
+            base = stem[:-len(suffix)]
+            forms.append(base)
+            if suffix == "ات":
+                # Plural of a taa marbuta noun: "صعوبات" -> "صعوبه"
+                forms.append(base + "ه")
+    return forms
+
+
+class LexiconSentimentEngine(SentimentEngine):
+    """
+    Word-list scorer for English and Arabic.
+
+    Polarity is the mean over sentiment-bearing words. A preceding intensifier scales a
+    word, a negation within the previous three words flips and halves it ("not good"),
+    and "!" strengthens the word before it. Arabic words are also looked up with common
+    clitic prefixes (و, ال, بال, ...) removed, then with inflectional endings (ات, ين,
+    tanween alif, ة) removed, and negations may carry a leading و or ف ("ولا").
+    """
+
+    name = "lexicon"
+    NEGATION_WINDOW = 3
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        self.lexicon = lexicon if lexicon is not None else {**EN_LEXICON, **AR_LEXICON}
+
+    def tokenize(self, text: str) -> List[str]:
+        return _WORD_RE.findall(_normalize_arabic(text.lower()))
+
+    def _lookup(self, token: str) -> Optional[float]:
+        polarity = self.lexicon.get(token)
+        if polarity is not None or not _is_arabic(token):
+            return polarity
+        # Exact stems first, so a listed inflected form keeps its own polarity
+        stems = [token, *_arabic_stems(token)]
+        for form in (*stems[1:], *(form for stem in stems for form in _arabic_unsuffixed(stem))):
+            polarity = self.lexicon.get(form)
+            if polarity is not None:
+                return polarity
+        return None
+
+    @staticmethod
+    def _is_negation(token: str) -> bool:
+        if token in NEGATIONS:
+            return True
+        return (
+            token[0] in _ARABIC_CONJUNCTIONS and len(token) > 2 and token[1:] in NEGATIONS
+        )
+
+    def score_tokens(self, tokens: Iterable[str]) -> float:
+        total = 0.0
+        count = 0
+        last = None  # Polarity of the previous sentiment word, for "!"
+        boost = 1.0
+        since_negation = self.NEGATION_WINDOW + 1
+        for token in tokens:
+            if token == "!":
+                if last is not None:
+                    boosted = max(-1.0, min(1.0, last * 1.25))
+                    total += boosted - last
+                    last = boosted
+                continue
+            if self._is_negation(token):
+                since_negation = 0
+                continue
+            if token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+                continue
+
+            since_negation += 1
+            polarity = self._lookup(token)
+            if polarity is None:
+                boost = 1.0
+                continue
+            polarity = max(-1.0, min(1.0, polarity * boost))
+            if since_negation <= self.NEGATION_WINDOW:
+                polarity *= -0.5
+                since_negation = self.NEGATION_WINDOW + 1
+            total += polarity
+            count += 1
+            last = polarity
+            boost = 1.0
+        return total / count if count else 0.0
+
+    def score(self, text: str) -> float:
+        return self.score_tokens(self.tokenize(text)) if text else 0.0
+
+
+class TextBlobSentimentEngine(SentimentEngine):
+    """TextBlob's pattern lexicon (English only). Imports TextBlob on construction."""
+
+    name = "textblob"
+    # Words, emoticons and punctuation, split the way TextBlob's tokenizer feeds its lexicon
+    _TOKEN_RE = re.compile(r"\(!\)|[:;=][-']?[()\[\]dp/\\|*]|\w+(?:-\w+)*|\.\.\.|[^\w\s]")
+
+    def __init__(self):
+        from textblob.en import sentiment
+
+        self._lexicon = sentiment
+
+    def score(self, text: str) -> float:
+        # Pre-tokenized input skips TextBlob's much slower tokenizer; same polarity
+        tokens = self._TOKEN_RE.findall(text.lower())
+        return self._lexicon(tokens)[0] if tokens else 0.0
+
+
+SENTIMENT_ENGINES: Dict[str, Callable[[], SentimentEngine]] = {
+    LexiconSentimentEngine.name: LexiconSentimentEngine,
+    TextBlobSentimentEngine.name: TextBlobSentimentEngine,
+}
+
+_engine: Optional[SentimentEngine] = None
+
+
+def register_sentiment_engine(name: str, factory: Callable[[], SentimentEngine]):
+    SENTIMENT_ENGINES[name] = factory
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """The engine named by settings.SENTIMENT_ENGINE, built on first use."""
+    global _engine
+    if _engine is None:
+        name = settings.SENTIMENT_ENGINE
+        try:
+            _engine = SENTIMENT_ENGINES[name]()
+        except (KeyError, ImportError) as e:
+            logger.warning("Sentiment engine %r unavailable, using lexicon: %s", name, e)
+            _engine = LexiconSentimentEngine()
+    return _engine
+
+
+def analyze(text: str) -> SentimentResult:
+    return get_sentiment_engine().analyze(text)
+
+
+def score_batch(texts: Sequence[str]) -> List[float]:
+    """Module-level so it can be submitted to a ProcessPoolExecutor."""
+    return get_sentiment_engine().score_many(texts)
+
+
+async def analyze_async(text: str) -> SentimentResult:
+    """analyze(), moved to a worker thread for texts long enough to stall the event loop."""
+    if len(text) > settings.SENTIMENT_OFFLOAD_CHARS:
+        return await asyncio.to_thread(analyze, text)
+    return analyze(text)
+
+
+async def score_batch_async(texts: Sequence[str]) -> List[float]:
+    return await asyncio.to_thread(score_batch, list(texts))
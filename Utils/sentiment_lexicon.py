@@ -0,0 +1,93 @@
+# BackEnd/Utils/sentiment_lexicon.py
+"""
+Word polarities for the lexicon sentiment engine, in [-1.0, 1.0].
+Arabic entries are stored in normalized form (see sentiment._normalize_arabic).
+"""
+
+EN_LEXICON = {
+    # Positive
+    "good": 0.7, "great": 0.8, "excellent": 1.0, "amazing": 0.6, "awesome": 1.0,
+    "wonderful": 1.0, "fantastic": 0.4, "perfect": 1.0, "best": 1.0, "better": 0.5,
+    "nice": 0.6, "lovely": 0.5, "love": 0.5, "loves": 0.5, "loved": 0.7, "loving": 0.6,
+    "like": 0.2, "enjoy": 0.4, "enjoys": 0.4, "enjoyed": 0.4, "happy": 0.8,
+    "happier": 0.6, "glad": 0.5, "calm": 0.3, "calmer": 0.3, "relaxed": 0.4,
+    "proud": 0.8, "confident": 0.5, "gentle": 0.3, "patient": 0.3,
+    "positive": 0.3, "healthy": 0.5, "safe": 0.5, "secure": 0.4, "helpful": 0.5,
+    "supportive": 0.5, "encouraging": 0.5, "encourage": 0.3, "praise": 0.5,
+    "praised": 0.5, "progress": 0.4, "improve": 0.4, "improved": 0.5,
+    "improving": 0.4, "success": 0.6, "successful": 0.7, "well": 0.3, "fine": 0.4,
+    "okay": 0.2, "ok": 0.2, "fun": 0.3, "funny": 0.25, "smart": 0.2, "clever": 0.5,
+    "bright": 0.5, "curious": 0.1, "cheerful": 0.7, "thank": 0.4, "thanks": 0.4,
+    "grateful": 0.7, "hope": 0.3, "hopeful": 0.5, "easy": 0.4, "easier": 0.4,
+    "normal": 0.15, "natural": 0.1, "predictable": 0.1, "effective": 0.6,
+    "useful": 0.3, "comfortable": 0.4, "peaceful": 0.5, "resilient": 0.4,
+    "independent": 0.3, "cooperative": 0.4, "polite": 0.4, "affectionate": 0.5,
+    "helped": 0.3, "works": 0.2, "worked": 0.2, "thriving": 0.6, "excited": 0.4,
+    # Negative
+    "bad": -0.7, "worse": -0.4, "worst": -1.0, "terrible": -1.0, "awful": -1.0,
+    "horrible": -1.0, "poor": -0.4, "sad": -0.5, "unhappy": -0.6, "upset": -0.5,
+    "angry": -0.5, "anger": -0.5, "mad": -0.6, "furious": -0.7, "frustrated": -0.6,
+    "frustrating": -0.6, "annoyed": -0.4, "annoying": -0.6, "afraid": -0.6,
+    "scared": -0.5, "fear": -0.5, "fears": -0.5, "anxious": -0.5, "anxiety": -0.5,
+    "worried": -0.4, "worry": -0.4, "worrying": -0.4, "nervous": -0.3,
+    "stressed": -0.5, "stress": -0.4, "stressful": -0.5, "tired": -0.4,
+    "exhausted": -0.6, "lonely": -0.5, "hurt": -0.5, "pain": -0.5, "sick": -0.7,
+    "ill": -0.5, "cry": -0.3, "cries": -0.3, "crying": -0.3, "cried": -0.3,
+    "scream": -0.4, "screams": -0.4, "screaming": -0.4, "yell": -0.4,
+    "yelling": -0.4, "hit": -0.4, "hits": -0.4, "hitting": -0.5, "bite": -0.3,
+    "biting": -0.4, "tantrum": -0.5, "tantrums": -0.5, "meltdown": -0.6,
+    "aggressive": -0.6, "violent": -0.8, "rude": -0.6,
+    "difficult": -0.4, "hard": -0.3, "struggle": -0.4, "struggles": -0.4,
+    "struggling": -0.5, "problem": -0.3, "problems": -0.3, "trouble": -0.4,
+    "fail": -0.5, "failed": -0.5, "failing": -0.5, "failure": -0.6,
+    "wrong": -0.5, "hate": -0.8, "hates": -0.8, "hated": -0.8, "refuses": -0.3,
+    "refused": -0.3, "refusing": -0.3, "stubborn": -0.4, "defiant": -0.5,
+    "bully": -0.7, "bullied": -0.7, "bullying": -0.7, "lying": -0.4,
+    "lies": -0.4, "jealous": -0.4, "isolated": -0.4, "overwhelmed": -0.5,
+    "helpless": -0.6, "hopeless": -0.8, "depressed": -0.7, "harmful": -0.6,
+    "dangerous": -0.6, "unsafe": -0.6, "concern": -0.2, "concerned": -0.3,
+    "concerning": -0.4, "confused": -0.3, "disappointed": -0.6, "guilty": -0.5,
+    "nightmare": -0.6, "nightmares": -0.6, "sleepless": -0.4, "boring": -1.0,
+}
+
+AR_LEXICON = {
+    # Positive
+    "جيد": 0.7, "جيده": 0.7, "ممتاز": 1.0, "ممتازه": 1.0, "رائع": 0.9, "رائعه": 0.9,
+    "جميل": 0.6, "جميله": 0.6, "احسن": 0.6, "افضل": 0.6, "سعيد": 0.8, "سعيده": 0.8,
+    "سعاده": 0.8, "فرح": 0.7, "فرحان": 0.7, "مبسوط": 0.7, "مسرور": 0.7,
+    "هادي": 0.3, "هادئ": 0.3, "هادئه": 0.3, "مرتاح": 0.4, "مرتاحه": 0.4,
+    "فخور": 0.8, "فخوره": 0.8, "واثق": 0.5, "لطيف": 0.6, "لطيفه": 0.6,
+    "صبور": 0.3, "حب": 0.5, "يحب": 0.4, "تحب": 0.4, "احب": 0.5, "نحب": 0.4,
+    "امن": 0.5, "امان": 0.5, "مفيد": 0.5, "مفيده": 0.5, "نجاح": 0.6, "ناجح": 0.7,
+    "تحسن": 0.4, "تقدم": 0.4, "شكرا": 0.4, "ممتن": 0.7, "امل": 0.3, "سهل": 0.4,
+    "طبيعي": 0.15, "متعاون": 0.4, "مهذب": 0.4, "مستقل": 0.3, "ذكي": 0.3,
+    "ذكيه": 0.3, "نشيط": 0.3, "متحمس": 0.4, "حنون": 0.5, "بخير": 0.4, "كويس": 0.5,
+    # Negative
+    "سيء": -0.7, "سيئ": -0.7, "سيئه": -0.7, "اسوا": -1.0, "فظيع": -1.0, "سوء": -0.6,
+    "حزين": -0.5, "حزينه": -0.5, "حزن": -0.5, "غاضب": -0.5, "غاضبه": -0.5,
+    "غضب": -0.5, "عصبي": -0.5, "عصبيه": -0.5, "خايف": -0.5, "خائف": -0.5,
+    "خائفه": -0.5, "خوف": -0.5, "قلق": -0.4, "قلقه": -0.4, "متوتر": -0.4,
+    "توتر": -0.4, "متعب": -0.4, "تعبان": -0.4, "مرهق": -0.6, "وحيد": -0.5,
+    "الم": -0.5, "مريض": -0.7, "مريضه": -0.7, "يبكي": -0.3, "تبكي": -0.3,
+    "بكاء": -0.3, "يصرخ": -0.4, "تصرخ": -0.4, "صراخ": -0.4, "يضرب": -0.5,
+    "تضرب": -0.5, "ضرب": -0.5, "يعض": -0.4, "نوبه": -0.4, "عدواني": -0.6,
+    "عنيف": -0.8, "وقح": -0.6, "صعب": -0.4, "صعبه": -0.4, "صعوبه": -0.4,
+    "مشكله": -0.3, "مشاكل": -0.3, "فشل": -0.6, "خطا": -0.5, "يكره": -0.8,
+    "تكره": -0.8, "كره": -0.8, "يرفض": -0.3, "ترفض": -0.3, "عنيد": -0.4,
+    "عنيده": -0.4, "تنمر": -0.7, "يكذب": -0.4, "كذب": -0.4,
+    "مكتئب": -0.7, "اكتئاب": -0.7, "خطير": -0.6, "خطر": -0.5, "محبط": -0.6,
+    "محبطه": -0.6, "كوابيس": -0.6, "ممل": -0.6, "زعلان": -0.5, "زعلانه": -0.5,
+}
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "n't", "without", "hardly", "nothing", "nobody", "neither", "nor",
+    "لا", "لم", "لن", "ليس", "ليست", "غير", "بدون", "مش", "مو", "ابدا",
+})
+
+# Multipliers applied to the next sentiment word
+INTENSIFIERS = {
+    "very": 1.3, "really": 1.3, "so": 1.2, "extremely": 1.5, "incredibly": 1.5,
+    "too": 1.2, "quite": 1.1, "pretty": 1.1, "super": 1.3, "totally": 1.3,
+    "slightly": 0.6, "somewhat": 0.7, "bit": 0.7, "little": 0.8,
+    "جدا": 1.3, "كثيرا": 1.3, "للغايه": 1.5, "قليلا": 0.7, "شويه": 0.7,
+}
@@ -0,0 +1,185 @@
+# BackEnd/Utils/user_cache.py
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from BackEnd.Models.user import User, UserRole
+from BackEnd.Utils.cache_invalidation import ALL, invalidation_bus
+from BackEnd.Utils.config import settings
+from BackEnd.Utils.database import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only view of the User columns needed by protected endpoints."""
+    user_id: int
+    email: str
+    role: UserRole
+    is_verified: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            user_id=user.user_id,
+            email=user.email,
+            role=UserRole(user.role),
+            is_verified=bool(user.is_verified),
+            created_at=user.created_at,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "user_id": self.user_id,
+            "email": self.email,
+            "role": self.role.value,
+            "is_verified": self.is_verified,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserSnapshot":
+        data = json.loads(raw)
+        return cls(
+            user_id=data["user_id"],
+            email=data["email"],
+            role=UserRole(data["role"]),
+            is_verified=data["is_verified"],
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        )
+
+
+class UserCache:
+    """
+    Short-TTL cache of UserSnapshot by email.
+    A small process-local TTL sits in front of Redis so most lookups never leave the worker.
+    Invalidations clear Redis and reach every worker's local tier through the invalidation
+    bus; while this worker isn't subscribed to it, the local tier is skipped.
+    """
+
+    def __init__(
+            self,
+            local_ttl: float = settings.USER_CACHE_LOCAL_TTL,
+            ttl: int = settings.USER_CACHE_TTL,
+            prefix: str = "user_cache:",
+    ):
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local: Dict[str, Tuple[float, UserSnapshot]] = {}
+        invalidation_bus.register("user", self._drop_local)
+
+    def _drop_local(self, email: str):
+        if email == ALL:
+            self._local.clear()
+        else:
+            self._local.pop(email, None)
+
+    def get(self, email: str) -> Optional[UserSnapshot]:
+        entry = self._local.get(email) if invalidation_bus.connected else None
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                return snapshot
+            self._local.pop(email, None)
+
+        if redis_client is None:
+            return None
+        try:
+            raw = redis_client.get(self.prefix + email)
+        except Exception as e:
+            logger.warning("User cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+
+        snapshot = UserSnapshot.from_json(raw)
+        self._remember(snapshot)
+        return snapshot
+
+    def _remember(self, snapshot: UserSnapshot):
+        if invalidation_bus.connected:
+            self._local[snapshot.email] = (time.monotonic() + self.local_ttl, snapshot)
+
+    def set(self, snapshot: UserSnapshot):
+        self._remember(snapshot)
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(self.prefix + snapshot.email, snapshot.to_json(), ex=self.ttl)
+        except Exception as e:
+            logger.warning("User cache write failed: %s", e)
+
+    def invalidate(self, email: str):
+        # Redis first, so no worker refills its local tier from the stale entry
+        if redis_client is not None:
+            try:
+                redis_client.delete(self.prefix + email)
+            except Exception as e:
+                logger.warning("User cache invalidation failed: %s", e)
+        invalidation_bus.publish("user", email)
+
+    def invalidate_all(self):
+        if redis_client is not None:
+            try:
+                keys = list(redis_client.scan_iter(match=self.prefix + "*", count=500))
+                for i in range(0, len(keys), 500):
+                    redis_client.delete(*keys[i:i + 500])
+            except Exception as e:
+                logger.warning("User cache flush failed: %s", e)
+        invalidation_bus.publish("user", ALL)
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(email: str):
+    """Drop a cached user after a role, verification or deletion change."""
+    user_cache.invalidate(email)
+
+
+# Any committed ORM change to a User (role, verification, deletion) clears its cache entry.
+# Bulk update()/delete() statements don't say which rows they touched, so they flush the
+# whole cache; Core statements on the users table bypass these hooks and must call
+# invalidate_user() themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target: User):
+    session = Session.object_session(target)
+    if session is not None:
+        emails = session.info.setdefault("changed_user_emails", set())
+        emails.add(target.email)
+        emails.update(inspect(target).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_user_change(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+            mapper.class_ is User for mapper in orm_execute_state.all_mappers
+    ):
+        orm_execute_state.session.info["all_users_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    emails = session.info.pop("changed_user_emails", ())
+    if session.info.pop("all_users_changed", False):
+        user_cache.invalidate_all()
+        return
+    for email in emails:
+        invalidate_user(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop("changed_user_emails", None)
+    session.info.pop("all_users_changed", None)
@@ -0,0 +1,83 @@
+"""add feedback daily rollups"""
+"""BackEnd/alembic/versions/c3f1d2a9e7b4_feedback_daily_rollups.py"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c3f1d2a9e7b4'
+down_revision = 'b6a114632fc6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    # The app's create_all may already have made the (empty) table
+    if 'feedback_daily_rollups' not in sa.inspect(bind).get_table_names():
+        _create_table()
+    if bind.execute(sa.text("SELECT 1 FROM feedback_daily_rollups LIMIT 1")).first() is None:
+        _seed()
+
+
+def _create_table():
+    op.create_table(
+        'feedback_daily_rollups',
+        sa.Column('day', sa.Date, primary_key=True),
+        sa.Column('child_id', sa.Integer, sa.ForeignKey('child_profiles.child_id', ondelete='CASCADE'),
+                  primary_key=True),
+        sa.Column('feedback_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('improvement_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('paired_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('paired_rating_sum', sa.Float, nullable=False, server_default='0'),
+        sa.Column('paired_rating_sq_sum', sa.Float, nullable=False, server_default='0'),
+        sa.Column('paired_sentiment_sum', sa.Float, nullable=False, server_default='0'),
+        sa.Column('paired_sentiment_sq_sum', sa.Float, nullable=False, server_default='0'),
+        sa.Column('paired_product_sum', sa.Float, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_feedback_rollup_child_day', 'feedback_daily_rollups', ['child_id', 'day'])
+
+
+def _seed():
+    # Seed rollups from existing ratings; same sums as analytics_queries.daily_feedback_aggregates
+    op.execute(
+        """
+        INSERT INTO feedback_daily_rollups (
+            day, child_id, feedback_count, rating_sum, improvement_count, paired_count,
+            paired_rating_sum, paired_rating_sq_sum, paired_sentiment_sum,
+            paired_sentiment_sq_sum, paired_product_sum
+        )
+        SELECT
+            CAST(date_trunc('day', rated.timestamp) AS DATE) AS day,
+            rated.child_id,
+            count(*),
+            sum(rated.rating),
+            sum(CASE WHEN rated.rating > rated.prev_rating THEN 1 ELSE 0 END),
+            count(rated.sentiment),
+            coalesce(sum(CASE WHEN rated.sentiment IS NOT NULL THEN CAST(rated.rating AS FLOAT) ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN rated.sentiment IS NOT NULL
+                              THEN CAST(rated.rating * rated.rating AS FLOAT) ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN rated.sentiment IS NOT NULL THEN rated.sentiment ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN rated.sentiment IS NOT NULL
+                              THEN rated.sentiment * rated.sentiment ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN rated.sentiment IS NOT NULL
+                              THEN rated.rating * rated.sentiment ELSE 0 END), 0)
+        FROM (
+            SELECT
+                child_id,
+                timestamp,
+                rating,
+                sentiment_score AS sentiment,
+                lag(rating) OVER (PARTITION BY child_id ORDER BY timestamp, id) AS prev_rating
+            FROM chat_logs
+            WHERE rating IS NOT NULL
+        ) AS rated
+        WHERE rated.timestamp IS NOT NULL
+        GROUP BY CAST(date_trunc('day', rated.timestamp) AS DATE), rated.child_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_feedback_rollup_child_day', table_name='feedback_daily_rollups')
+    op.drop_table('feedback_daily_rollups')
@@ -0,0 +1,42 @@
+"""unique generated recommendation per child, title, type and day"""
+"""BackEnd/alembic/versions/d4a7b2c9f1e3_recommendation_dedupe_index.py"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd4a7b2c9f1e3'
+down_revision = 'c3f1d2a9e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app builds this index itself on startup (ensure_recommendation_indexes)
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('recommendations')}
+    if 'uq_recommendation_child_title_type_date' in existing:
+        return
+    # Keep the oldest copy of each duplicate generated row before the unique index can be
+    # built; manually entered recommendations are not covered by the index and are left alone
+    op.execute(
+        """
+        DELETE FROM recommendations r
+        USING recommendations keep
+        WHERE r.child_id = keep.child_id
+          AND r.title = keep.title
+          AND r.type IS NOT DISTINCT FROM keep.type
+          AND r.effective_date = keep.effective_date
+          AND r.id > keep.id
+          AND r.source = 'AI_MODEL'
+          AND keep.source = 'AI_MODEL'
+        """
+    )
+    op.create_index(
+        'uq_recommendation_child_title_type_date',
+        'recommendations',
+        ['child_id', 'title', 'type', 'effective_date'],
+        unique=True,
+        postgresql_where=sa.text("source = 'AI_MODEL'"),
+    )
+
+
+def downgrade():
+    op.drop_index('uq_recommendation_child_title_type_date', table_name='recommendations')
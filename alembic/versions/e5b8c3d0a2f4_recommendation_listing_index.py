@@ -0,0 +1,25 @@
+"""index recommendations for keyset listing per child"""
+"""BackEnd/alembic/versions/e5b8c3d0a2f4_recommendation_listing_index.py"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e5b8c3d0a2f4'
+down_revision = 'd4a7b2c9f1e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app builds this index itself on startup (ensure_recommendation_indexes)
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('recommendations')}
+    if 'ix_recommendation_child_created' in existing:
+        return
+    op.create_index(
+        'ix_recommendation_child_created',
+        'recommendations',
+        ['child_id', 'created_at', 'id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_recommendation_child_created', table_name='recommendations')
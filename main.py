@@ -9,6 +9,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from BackEnd.middleware.security_headers import security_headers
 from fastapi.middleware import Middleware
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from fastapi.exceptions import RequestValidationError
@@ -20,15 +21,21 @@ from BackEnd.Models.user import User, UserRole
 from BackEnd.Routes import admin, auth, child_profile, recommendation, analytics, settings as Settings
 from BackEnd.Utils.auth_utils import get_current_user
 from BackEnd.Utils.config import settings
-from BackEnd.Utils.database import Base, check_database_health, engine
+from BackEnd.Utils.database import Base, check_database_health, engine, async_engine
 from BackEnd.Utils.mongo_client import ensure_indexes
-from BackEnd.Utils.rate_limiter import init_rate_limiter
+from BackEnd.Utils.chat_writer import chat_write_queue
+from BackEnd.Utils.recommendation_writer import ensure_recommendation_indexes
+from BackEnd.Utils.feedback_rollups import backfill_feedback_rollups
+from BackEnd.Utils.feedback_broadcaster import feedback_broadcaster
+from BackEnd.Utils.cache_invalidation import invalidation_bus
+from BackEnd.Utils.rate_limiter import init_rate_limiter, rate_limit_dep, rate_limiter_stats
 # from BackEnd.Utils.sanitization import SanitizationMiddleware
 from pydantic import BaseModel
 from typing import Optional
-from BackEnd.Utils.ai_integration import get_ai_response
-from BackEnd.Models.child_profile import ChildProfile
-from BackEnd.Utils.database import get_db
+from BackEnd.Utils.ai_integration import get_ai_response, init_ai_clients, close_ai_clients, ai_backend_stats
+from BackEnd.Utils.ai_cache import ai_response_cache
+from BackEnd.Utils.child_access import child_access_cache
+from BackEnd.Utils.database import get_async_db
 from BackEnd.Routes import chat as ChatRoutes
 
 load_dotenv()
@@ -74,6 +81,7 @@ async def lifespan(app: FastAPI):
     logger.info("App startup")
     try:
         await init_rate_limiter()
+        await init_ai_clients()
 
         db_health = await check_database_health()
         logger.info(f"Database health: {db_health}")
@@ -87,7 +95,12 @@ async def lifespan(app: FastAPI):
             logger.warning(f"MongoDB health check failed: {db_health['mongodb'].get('error')}")
 
         Base.metadata.create_all(bind=engine)
+        ensure_recommendation_indexes(engine)
+        backfill_feedback_rollups(engine)
         await ensure_indexes()
+        await chat_write_queue.start()
+        await feedback_broadcaster.start()
+        await invalidation_bus.start()
 
     except Exception as e:
         logger.error("Startup errors", exc_info=e)
@@ -95,6 +108,11 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await invalidation_bus.stop()
+    await feedback_broadcaster.stop()
+    await chat_write_queue.drain()
+    await close_ai_clients()
+    await async_engine.dispose()
     engine.dispose()
     logger.info("App shutdown")
 
@@ -135,10 +153,12 @@ app.include_router(Settings.router, prefix="/api/auth/settings")
 class AIRequest(BaseModel):
     user_input: str
     child_id: int
-    child_age: int
-    child_name: str
+    # Ignored: age and name come from the stored profile; kept so existing clients validate
+    child_age: Optional[int] = None
+    child_name: Optional[str] = None
     context: Optional[str] = None
     hf_model_name: Optional[str] = None
+    use_cache: bool = True
 
 
 # @app.options("/api/auth/child")
@@ -185,24 +205,33 @@ async def read_current_user(current_user: User = Depends(get_current_user)):
     }
 
 
-@app.post("/ai/respond")
+@app.post("/ai/respond", dependencies=[Depends(rate_limit_dep("chat", "ai_upstream"))])
 async def ai_respond(
         request: AIRequest,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
-    child = db.query(ChildProfile).filter_by(child_id=request.child_id, user_id=current_user.user_id).first()
-    if not child:
-        raise HTTPException(status_code=403, detail="Access to child denied.")
+    child = await child_access_cache.require(db, current_user.user_id, request.child_id, detail="Access to child denied.")
 
     return await get_ai_response(
         user_input=request.user_input,
-        child_age=request.child_age,
-        child_name=request.child_name,
+        child_age=child.age,
+        child_name=child.name,
         context=request.context,
+        use_cache=request.use_cache,
+        model_hint=request.hf_model_name,
     )
 
 
+@app.get("/api/ai/metrics", dependencies=[Depends(require_role(UserRole.ADMIN))])
+async def ai_metrics():
+    return {
+        "cache": ai_response_cache.stats(),
+        **ai_backend_stats(),
+        "rate_limiter": rate_limiter_stats(),
+    }
+
+
 class HealthCheck(BaseModel):
     status: str = "OK"
 
@@ -234,7 +263,8 @@ async def security_info(request: Request):
 async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "code": exc.status_code}
+        content={"error": exc.detail, "code": exc.status_code},
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -0,0 +1,117 @@
+# BackEnd/tests/test_circuit_breaker.py
+
+import pytest
+
+from BackEnd.Utils import ai_limits
+from BackEnd.Utils.ai_limits import CircuitBreaker
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(ai_limits, "time", fake)
+    return fake
+
+
+def make_breaker(**overrides):
+    options = dict(window=60.0, min_calls=4, failure_rate=0.5, open_seconds=30.0, half_open_probes=1)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_opens_at_failure_rate(clock):
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.trips == 1
+    assert breaker.refused == 1
+
+
+def test_outcomes_outside_window_do_not_count(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 61.0
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_after_cooldown_limits_probes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+
+    clock.now += 30.0
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30.0
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    # The failures that tripped it were cleared
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30.0
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    clock.now += 29.0
+    assert not breaker.allow()
+
+
+def test_release_frees_probe_slot(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30.0
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.allow()
@@ -0,0 +1,126 @@
+# BackEnd/tests/test_feedback_rollups.py
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+# ChatLog's relationships resolve against every model
+import BackEnd.Models  # noqa: F401
+import BackEnd.Models.recommendation  # noqa: F401
+from BackEnd.Models.chat_log import ChatLog
+from BackEnd.Models.feedback_rollup import FeedbackDailyRollup
+from BackEnd.Utils.analytics_queries import daily_feedback_aggregates
+from BackEnd.Utils.database import Base
+from BackEnd.Utils.feedback_rollups import _SUM_COLUMNS, apply_feedback, compact_feedback_rollups
+
+DAY_1 = datetime(2025, 3, 1, 9)
+DAY_2 = datetime(2025, 3, 2, 9)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ChatLog.__table__, FeedbackDailyRollup.__table__])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def add_log(db, timestamp, child_id=1, sentiment=None):
+    log = ChatLog(
+        user_id=1, child_id=child_id, _user_input="q", _chatbot_response="a",
+        sentiment_score=sentiment, timestamp=timestamp,
+    )
+    db.add(log)
+    db.flush()
+    return log
+
+
+def rate(db, log, rating):
+    previous = log.rating
+    log.rating = rating
+    db.flush()
+    apply_feedback(db, log, previous)
+    db.flush()
+
+
+def rollup_rows(db):
+    rows = db.execute(select(FeedbackDailyRollup)).scalars()
+    return {
+        (row.day, row.child_id): {col: getattr(row, col) for col in _SUM_COLUMNS}
+        for row in rows
+        # Rows whose ratings were all cleared hold only zeros; the aggregate has no row for them
+        if any(getattr(row, col) for col in _SUM_COLUMNS)
+    }
+
+
+def aggregate_rows(db):
+    return {
+        (row.day, row.child_id): {col: getattr(row, col) for col in _SUM_COLUMNS}
+        for row in db.execute(daily_feedback_aggregates())
+    }
+
+
+def assert_agree(db):
+    expected = aggregate_rows(db)
+    actual = rollup_rows(db)
+    assert actual.keys() == expected.keys()
+    for key, sums in expected.items():
+        assert actual[key] == {col: pytest.approx(value) for col, value in sums.items()}, key
+
+
+def test_ratings_in_order(db):
+    logs = [add_log(db, DAY_1.replace(hour=h), sentiment=0.5) for h in (9, 10)] + [add_log(db, DAY_2)]
+    for log, rating in zip(logs, (2, 4, 5)):
+        rate(db, log, rating)
+
+    assert_agree(db)
+    assert aggregate_rows(db)[(DAY_2.date(), 1)]["improvement_count"] == 1
+
+
+def test_rating_out_of_order_updates_successor(db):
+    first, middle, last = (add_log(db, ts, sentiment=-0.2) for ts in (DAY_1, DAY_1.replace(hour=12), DAY_2))
+    rate(db, first, 3)
+    rate(db, last, 4)
+    assert_agree(db)
+
+    # Rating the middle log changes what `last` is compared against
+    rate(db, middle, 5)
+    assert_agree(db)
+
+
+def test_rerating_and_clearing(db):
+    first, middle, last = (add_log(db, ts) for ts in (DAY_1, DAY_1.replace(hour=12), DAY_2))
+    rate(db, first, 2)
+    rate(db, middle, 1)
+    rate(db, last, 3)
+
+    rate(db, middle, 4)
+    assert_agree(db)
+    rate(db, middle, None)
+    assert_agree(db)
+    rate(db, first, None)
+    assert_agree(db)
+
+
+def test_children_are_independent(db):
+    a = add_log(db, DAY_1, child_id=1, sentiment=0.1)
+    b = add_log(db, DAY_1.replace(hour=10), child_id=2, sentiment=0.9)
+    rate(db, a, 2)
+    rate(db, b, 5)
+    rate(db, a, 3)
+
+    assert_agree(db)
+
+
+def test_compaction_matches_incremental_rollups(db):
+    logs = [add_log(db, ts, sentiment=0.3) for ts in (DAY_1, DAY_1.replace(hour=11), DAY_2)]
+    for log, rating in zip(logs, (5, 1, 3)):
+        rate(db, log, rating)
+    incremental = rollup_rows(db)
+
+    compact_feedback_rollups(db, since=None)
+
+    assert rollup_rows(db) == incremental
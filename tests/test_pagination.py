@@ -0,0 +1,47 @@
+# BackEnd/tests/test_pagination.py
+
+import base64
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from BackEnd.Utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("timestamp", [
+    datetime(2025, 3, 1, 9, 30),
+    datetime(2025, 3, 1, 9, 30, 15, 123456),
+    datetime(2025, 3, 1, 9, 30, tzinfo=timezone.utc),
+])
+def test_round_trip(timestamp):
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    cursor = encode_cursor(datetime(2025, 3, 1, 9, 30, 15, 123456), 7)
+
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+def test_cursors_keep_tuple_order():
+    earlier = decode_cursor(encode_cursor(datetime(2025, 3, 1), 9))
+    later = decode_cursor(encode_cursor(datetime(2025, 3, 1), 10))
+
+    assert earlier < later
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b"2025-03-01T09:30:00").decode(),
+    base64.urlsafe_b64encode(b"2025-03-01T09:30:00|abc").decode(),
+    base64.urlsafe_b64encode(b"yesterday|1").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),
+])
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+
+    assert exc.value.status_code == 400
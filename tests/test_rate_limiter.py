@@ -0,0 +1,96 @@
+# BackEnd/tests/test_rate_limiter.py
+
+import pytest
+
+from BackEnd.Utils import rate_limiter
+from BackEnd.Utils.rate_limiter import RATE_LIMIT_POLICIES, RateLimitPolicy, _LocalBuckets
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+USER = RateLimitPolicy("default", capacity=2, refill_per_second=1.0)
+GLOBAL = RateLimitPolicy("ai_upstream", capacity=5, refill_per_second=0.5, scope="global")
+
+
+def test_take_drains_then_rejects_with_retry_after(clock):
+    buckets = _LocalBuckets()
+    key = [("rate_limit:default:user:1", USER)]
+
+    assert buckets.take(key)[0]
+    assert buckets.take(key)[0]
+    allowed, levels, retry_after = buckets.take(key)
+
+    assert not allowed
+    assert levels == [0.0]
+    assert retry_after == pytest.approx(1.0)
+
+
+def test_take_refills_with_elapsed_time(clock):
+    buckets = _LocalBuckets()
+    key = [("rate_limit:default:user:1", USER)]
+    buckets.take(key, cost=2)
+
+    clock.now += 1.5
+    allowed, levels, _ = buckets.take(key)
+
+    assert allowed
+    assert levels == [pytest.approx(0.5)]
+
+
+def test_take_charges_all_buckets_or_none(clock):
+    buckets = _LocalBuckets()
+    user = ("rate_limit:default:user:1", USER)
+    upstream = ("rate_limit:ai_upstream", GLOBAL)
+    buckets.take([user], cost=2)
+
+    allowed, levels, retry_after = buckets.take([user, upstream])
+
+    assert not allowed
+    # The global bucket had room but must not be charged for a rejected request
+    assert levels == [0.0, 5.0]
+    assert retry_after == pytest.approx(1.0)
+    assert buckets.take([upstream], cost=5)[0]
+
+
+def test_precheck_ignores_unknown_keys(clock):
+    buckets = _LocalBuckets()
+
+    assert buckets.precheck([("rate_limit:default:user:1", USER)]) is None
+    assert buckets.stats()["shed"] == 0
+
+
+def test_precheck_sheds_only_empty_buckets(clock):
+    buckets = _LocalBuckets()
+    key = [("rate_limit:default:user:1", USER)]
+    buckets.sync(key[0][0], 0.0)
+
+    assert buckets.precheck(key) == pytest.approx(1.0)
+    assert buckets.stats()["shed"] == 1
+
+    clock.now += 1.0
+    assert buckets.precheck(key) is None
+
+
+def test_prune_drops_refilled_buckets(clock):
+    # Pruning looks the policy up by the name in the key
+    policy = RATE_LIMIT_POLICIES["default"]
+    buckets = _LocalBuckets(prune_interval=10.0)
+    buckets.sync("rate_limit:default:user:1", 0.0)
+
+    clock.now += policy.capacity / policy.refill_per_second
+    buckets.sync("rate_limit:default:user:2", 0.0)
+
+    assert buckets.stats()["keys"] == 1
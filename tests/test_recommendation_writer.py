@@ -0,0 +1,96 @@
+# BackEnd/tests/test_recommendation_writer.py
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Recommendation's relationships resolve against the other models
+import BackEnd.Models.recommendation  # noqa: F401
+import BackEnd.Models.child_profile  # noqa: F401
+from BackEnd.Models.recommendation import Recommendation, RecommendationSource
+from BackEnd.Utils.recommendation_writer import build_insert, recommendation_rows, write_recommendations
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Recommendation.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def rec(title, **extra):
+    return {"title": title, "description": f"{title} description", "type": "behavior", **extra}
+
+
+def count(db, **filters):
+    return db.scalar(select(func.count()).select_from(Recommendation).filter_by(**filters))
+
+
+def test_rows_default_source_priority_and_day():
+    (row,) = recommendation_rows([(1, rec("Sleep", metadata={"k": 1}))])
+
+    assert row["source"] == RecommendationSource.AI_MODEL
+    assert row["priority"].value == "medium"
+    assert row["effective_date"] == row["created_at"].date()
+    assert row["extra_data"] == {"k": 1}
+
+
+def test_rows_keep_first_of_each_duplicate():
+    rows = recommendation_rows([
+        (1, rec("Sleep", priority="high")),
+        (1, rec("Sleep", priority="low")),
+        (2, rec("Sleep")),
+        (1, rec("Sleep", type="emotion")),
+    ])
+
+    assert len(rows) == 3
+    assert rows[0]["priority"].value == "high"
+
+
+def test_insert_skips_existing_and_repeated_rows(db):
+    assert write_recommendations(db, 1, [rec("Sleep"), rec("Play")]) == 2
+    assert write_recommendations(db, 1, [rec("Sleep"), rec("Read")]) == 1
+    db.commit()
+
+    assert count(db, child_id=1) == 3
+
+
+def test_insert_skips_titles_still_active(db):
+    today = date.today()
+    write_recommendations(db, 1, [rec("Sleep", effective_date=today - timedelta(days=3))])
+    write_recommendations(db, 1, [rec("Sleep", effective_date=today)])
+    write_recommendations(db, 1, [rec("Play", effective_date=today - timedelta(days=3),
+                                      expiration_date=today - timedelta(days=1))])
+    write_recommendations(db, 1, [rec("Play", effective_date=today)])
+    db.commit()
+
+    assert count(db, title="Sleep") == 1
+    assert count(db, title="Play") == 2
+    assert db.scalar(select(func.max(Recommendation.effective_date))) == today
+
+
+def test_conflict_target_matches_partial_index():
+    compiled = str(build_insert(recommendation_rows([(1, rec("Sleep"))]), "sqlite").compile(
+        dialect=sqlite.dialect()
+    ))
+
+    assert "ON CONFLICT (child_id, title, type, effective_date) WHERE source = 'AI_MODEL' DO NOTHING" in compiled
+
+
+def test_unique_index_covers_generated_rows_only(db):
+    (row,) = recommendation_rows([(1, rec("Sleep"))])
+    manual = dict(row, source=RecommendationSource.PEDIATRICIAN)
+
+    db.execute(Recommendation.__table__.insert(), [manual, manual])
+    db.commit()
+    assert count(db, source=RecommendationSource.PEDIATRICIAN) == 2
+
+    db.execute(Recommendation.__table__.insert(), [row])
+    with pytest.raises(IntegrityError):
+        db.execute(Recommendation.__table__.insert(), [row])
@@ -0,0 +1,54 @@
+# BackEnd/tests/test_sentiment.py
+
+import pytest
+
+from BackEnd.Utils.sentiment import LexiconSentimentEngine, sentiment_label
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LexiconSentimentEngine()
+
+
+@pytest.mark.parametrize("text, label", [
+    ("He is very happy today!", "positive"),
+    ("She was not happy", "negative"),
+    ("It isn't bad", "positive"),
+    ("The weather", "neutral"),
+])
+def test_english(engine, text, label):
+    assert engine.analyze(text).label == label
+
+
+@pytest.mark.parametrize("inflected, base", [
+    ("جيداً", "جيد"),  # tanween alif
+    ("جيدا", "جيد"),
+    ("مرهقة", "مرهق"),  # taa marbuta
+    ("السعيدين", "سعيد"),  # prefix and masculine plural
+    ("سعيدون", "سعيد"),
+    ("صعوبات", "صعوبه"),  # feminine plural of a taa marbuta noun
+])
+def test_arabic_suffixes_are_normalized(engine, inflected, base):
+    assert engine.score(inflected) == pytest.approx(engine.lexicon[base])
+
+
+def test_listed_forms_keep_their_own_polarity(engine):
+    # "فرحان" ends like a dual but is in the lexicon as is
+    assert engine.score("فرحان") == pytest.approx(engine.lexicon["فرحان"])
+
+
+@pytest.mark.parametrize("text, label", [
+    ("هذا ليس جيدا", "negative"),
+    ("الطفل ليس سعيداً", "negative"),
+    ("ابني لم يكن سعيدا اليوم", "negative"),
+    ("البنت ليست سعيدة", "negative"),
+    ("هذا ليس سيئا", "positive"),
+    ("الولد سعيد جدا", "positive"),
+])
+def test_arabic_negation(engine, text, label):
+    assert sentiment_label(engine.score(text)) == label
+
+
+@pytest.mark.parametrize("text", ["مش كويس", "غير مفيد", "ولا سعيد", "لا يحب المدرسة"])
+def test_arabic_negation_flips_polarity(engine, text):
+    assert engine.score(text) < 0